@@ -16,8 +16,19 @@ if not SQLALCHEMY_DATABASE_URL:
         "with your Neon PostgreSQL connection string."
     )
 
+# Sync handlers run on FastAPI's worker threads, and main.lifespan caps those
+# threads at pool_size + max_overflow. The defaults are SQLAlchemy's own (at
+# most 15 connections per process); raise them only within Neon's connection
+# limit, which is shared by every worker and the stats cron.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+_pool_options = {}
+if not SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    _pool_options = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW}
+
 # Neon/PostgreSQL connection.
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, **_pool_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -7,7 +7,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from database import get_db
 from models import User, UserRole
@@ -17,7 +17,15 @@ ANON_KEY_SECRET = os.getenv("ANON_KEY_SECRET", "anon-secret-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
-pwd_context = CryptContext(schemes=["bcrypt", "pbkdf2_sha256"], deprecated="auto")
+# bcrypt cost dominates login latency; 10 rounds is the OWASP floor and can be
+# raised per deployment without invalidating existing hashes.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt", "pbkdf2_sha256"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
 auth_scheme = HTTPBearer()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -29,7 +37,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email.strip().lower()).first()
+    return (
+        db.query(User)
+        .options(undefer(User.hashed_password))
+        .filter(User.email == email.strip().lower())
+        .first()
+    )
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(auth_scheme),
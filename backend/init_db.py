@@ -1,6 +1,7 @@
 from database import Base, engine
-import models  # noqa: F401
+from models import upgrade_schema
 
 print("Connecting to Neon and creating tables...")
 Base.metadata.create_all(bind=engine)
-print("Tables created successfully!")
+upgrade_schema(engine)
+print("Tables created and schema upgraded successfully!")
@@ -1,17 +1,34 @@
 from __future__ import annotations
 import os
+from contextlib import asynccontextmanager
 from typing import List
 
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
-from database import Base, engine
+from database import Base, DB_MAX_OVERFLOW, DB_POOL_SIZE, engine
 from routers import auth, feedback, courses, analytics
 
-# Create tables (dev only)
+# Create tables (dev only); existing databases are upgraded by init_db.py.
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Feedback System API")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Route handlers are sync and run on AnyIO's thread limiter (40 by default);
+    # match it to the DB pool so concurrency is bounded by connections, not threads.
+    to_thread.current_default_thread_limiter().total_tokens = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    yield
+
+
+app = FastAPI(
+    title="Feedback System API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 
 def _cors_allowed_origins() -> List[str]:
@@ -49,8 +66,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[analytics.STATS_REFRESHED_HEADER],
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Include Routers
 app.include_router(auth.router)
 app.include_router(feedback.router)
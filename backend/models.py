@@ -3,19 +3,25 @@ from __future__ import annotations
 import enum
 
 from sqlalchemy import (
+    DDL,
     Boolean,
+    CheckConstraint,
     Column,
+    Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    event,
 )
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.schema import AddConstraint, CreateIndex
+from sqlalchemy.orm import configure_mappers, deferred, relationship, validates
+from sqlalchemy.sql import func, text
 
 from database import Base
 
@@ -32,22 +38,42 @@ class FlagReviewAction(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        CheckConstraint("email = lower(email)", name="ck_users_email_lowercase"),
+        # Lecturer lookups dominate role-filtered traffic; keep a small, hot partial index.
+        Index("ix_users_lecturer_email", "email", postgresql_where=text("role = 'LECTURER'")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
-    role = Column(Enum(UserRole, name="user_role"), nullable=False, default=UserRole.STUDENT)
+    # Only login/password flows need the hash; keep it out of get_current_user's SELECT.
+    hashed_password = deferred(Column(String(255), nullable=False))
+    role = Column(
+        Enum(UserRole, name="user_role", native_enum=False, create_constraint=True, length=16),
+        nullable=False,
+        default=UserRole.STUDENT,
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     lecturer_profile = relationship("LecturerProfile", back_populates="user", uselist=False)
     feedbacks_received = relationship(
-        "Feedback", back_populates="lecturer", foreign_keys="Feedback.lecturer_id"
+        "Feedback",
+        back_populates="lecturer",
+        foreign_keys="Feedback.lecturer_id",
+        passive_deletes=True,
     )
     feedback_tokens = relationship(
-        "FeedbackToken", back_populates="lecturer", foreign_keys="FeedbackToken.lecturer_id"
+        "FeedbackToken",
+        back_populates="lecturer",
+        foreign_keys="FeedbackToken.lecturer_id",
+        passive_deletes=True,
     )
     course_assignments = relationship(
-        "CourseAssignment", back_populates="lecturer", foreign_keys="CourseAssignment.lecturer_id"
+        "CourseAssignment",
+        back_populates="lecturer",
+        foreign_keys="CourseAssignment.lecturer_id",
+        passive_deletes=True,
     )
     flag_reviews = relationship(
         "FeedbackFlagReview", back_populates="reviewer", foreign_keys="FeedbackFlagReview.reviewed_by"
@@ -56,6 +82,10 @@ class User(Base):
         "AdminAuditLog", back_populates="admin", foreign_keys="AdminAuditLog.admin_id"
     )
 
+    @validates("email")
+    def _normalize_email(self, _key: str, value: str) -> str:
+        return value.strip().lower()
+
 
 class LecturerProfile(Base):
     __tablename__ = "lecturer_profiles"
@@ -71,21 +101,37 @@ class LecturerProfile(Base):
 
 class FeedbackToken(Base):
     __tablename__ = "feedback_tokens"
+    __table_args__ = (
+        Index("ix_feedback_tokens_used", "is_used"),
+        # Lets the per-course token tracker aggregate from the index alone.
+        Index("ix_feedback_tokens_course_used", "course_code", "is_used"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     token = Column(String(128), unique=True, index=True, nullable=False)
-    lecturer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    course_code = Column(String(50), nullable=False, index=True)
+    lecturer_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # Lookups by course go through ix_feedback_tokens_course_used, which leads with this column.
+    course_code = Column(String(50), nullable=False)
     is_used = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     used_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     lecturer = relationship("User", back_populates="feedback_tokens", foreign_keys=[lecturer_id])
-    feedbacks = relationship("Feedback", back_populates="token")
-    rejected_attempts = relationship("ToxicityRejectedAttempt", back_populates="token")
-    session_metadata = relationship("TokenSession", back_populates="token", uselist=False)
+    feedbacks = relationship("Feedback", back_populates="token", passive_deletes=True)
+    rejected_attempts = relationship(
+        "ToxicityRejectedAttempt", back_populates="token", passive_deletes=True
+    )
+    session_metadata = relationship(
+        "TokenSession", back_populates="token", uselist=False, passive_deletes=True
+    )
     student_submissions = relationship(
-        "StudentSessionSubmission", back_populates="token", foreign_keys="StudentSessionSubmission.token_id"
+        "StudentSessionSubmission",
+        back_populates="token",
+        foreign_keys="StudentSessionSubmission.token_id",
+        passive_deletes=True,
     )
 
 
@@ -96,7 +142,9 @@ class CourseAssignment(Base):
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    lecturer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    lecturer_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     course_code = Column(String(50), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -105,30 +153,68 @@ class CourseAssignment(Base):
 
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (
+        # Append-only: a BRIN index prunes time-windowed scans at a fraction of a btree's size.
+        Index("ix_feedback_created_at_brin", "created_at", postgresql_using="brin"),
+        # Lecturer dashboards filter by lecturer and time; cover the aggregated columns.
+        Index(
+            "ix_feedback_lecturer_created",
+            "lecturer_id",
+            "created_at",
+            postgresql_include=["rating", "course_code", "is_flagged"],
+        ),
+        Index(
+            "ix_feedback_flagged_pending",
+            "created_at",
+            postgresql_where=text("is_flagged = true"),
+            # Lets the admin dashboard KPI query anti-join flagged rows against
+            # feedback_flag_reviews on id from the index alone.
+            postgresql_include=["id"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    lecturer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    token_id = Column(Integer, ForeignKey("feedback_tokens.id"), nullable=True, index=True)
+    lecturer_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    token_id = Column(
+        Integer, ForeignKey("feedback_tokens.id", ondelete="CASCADE"), nullable=True, index=True
+    )
     course_code = Column(String(50), nullable=False, index=True)
     rating = Column(Integer, nullable=False)
     text = Column(Text, nullable=True)
     sentiment_score = Column(Float, nullable=False, default=0.0)
     is_flagged = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     lecturer = relationship("User", back_populates="feedbacks_received", foreign_keys=[lecturer_id])
     token = relationship("FeedbackToken", back_populates="feedbacks")
-    flag_review = relationship("FeedbackFlagReview", back_populates="feedback", uselist=False)
+    flag_review = relationship(
+        "FeedbackFlagReview", back_populates="feedback", uselist=False, passive_deletes=True
+    )
 
 
 class FeedbackFlagReview(Base):
     __tablename__ = "feedback_flag_reviews"
 
     id = Column(Integer, primary_key=True, index=True)
-    feedback_id = Column(Integer, ForeignKey("feedback.id"), unique=True, nullable=False, index=True)
+    feedback_id = Column(
+        Integer,
+        ForeignKey("feedback.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+        index=True,
+    )
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     action = Column(
-        Enum(FlagReviewAction, name="flag_review_action"),
+        Enum(
+            FlagReviewAction,
+            name="flag_review_action",
+            native_enum=False,
+            create_constraint=True,
+            length=16,
+        ),
         nullable=False,
         default=FlagReviewAction.DISMISSED,
     )
@@ -141,10 +227,18 @@ class FeedbackFlagReview(Base):
 
 class ToxicityRejectedAttempt(Base):
     __tablename__ = "toxicity_rejected_attempts"
+    __table_args__ = (
+        Index("ix_toxicity_rejected_attempts_review_queue", "is_reviewed", "created_at"),
+        Index("ix_toxicity_unreviewed", "id", postgresql_where=text("is_reviewed = false")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    token_id = Column(Integer, ForeignKey("feedback_tokens.id"), nullable=False, index=True)
-    lecturer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_id = Column(
+        Integer, ForeignKey("feedback_tokens.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    lecturer_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     course_code = Column(String(50), nullable=False, index=True)
     text = Column(Text, nullable=False)
     reason = Column(String(100), nullable=False, default="UNPROFESSIONAL_LANGUAGE")
@@ -153,6 +247,7 @@ class ToxicityRejectedAttempt(Base):
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     review_note = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     token = relationship("FeedbackToken", back_populates="rejected_attempts", foreign_keys=[token_id])
 
@@ -161,7 +256,13 @@ class TokenSession(Base):
     __tablename__ = "token_sessions"
 
     id = Column(Integer, primary_key=True, index=True)
-    token_id = Column(Integer, ForeignKey("feedback_tokens.id"), unique=True, nullable=False, index=True)
+    token_id = Column(
+        Integer,
+        ForeignKey("feedback_tokens.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+        index=True,
+    )
     course_code = Column(String(50), nullable=False, index=True)
     session_key = Column(String(32), nullable=False, index=True)
     session_label = Column(String(120), nullable=False)
@@ -182,11 +283,16 @@ class StudentSessionSubmission(Base):
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    anon_student_key = Column(String(128), nullable=False, index=True)
+    # Lookups go through uq_student_session_submission_once, which leads with this column.
+    anon_student_key = Column(String(128), nullable=False)
     course_code = Column(String(50), nullable=False, index=True)
     session_key = Column(String(32), nullable=False, index=True)
-    token_id = Column(Integer, ForeignKey("feedback_tokens.id"), nullable=False, index=True)
-    feedback_id = Column(Integer, ForeignKey("feedback.id"), nullable=True, index=True)
+    token_id = Column(
+        Integer, ForeignKey("feedback_tokens.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    feedback_id = Column(
+        Integer, ForeignKey("feedback.id", ondelete="CASCADE"), nullable=True, index=True
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     token = relationship("FeedbackToken", back_populates="student_submissions", foreign_keys=[token_id])
@@ -194,6 +300,9 @@ class StudentSessionSubmission(Base):
 
 class AdminAuditLog(Base):
     __tablename__ = "admin_audit_logs"
+    __table_args__ = (
+        Index("ix_admin_audit_logs_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     admin_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -204,3 +313,235 @@ class AdminAuditLog(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     admin = relationship("User", back_populates="admin_audit_logs", foreign_keys=[admin_id])
+
+
+class LecturerCourseStats(Base):
+    __tablename__ = "lecturer_course_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "lecturer_id",
+            "course_code",
+            "window_start",
+            name="uq_lecturer_course_stats_window",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    lecturer_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    course_code = Column(String(50), nullable=False, index=True)
+    window_start = Column(Date, nullable=False)
+    feedback_count = Column(Integer, nullable=False, default=0)
+    avg_rating = Column(Float, nullable=True)
+    flagged_count = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# updated_at is maintained by a Postgres trigger rather than ORM onupdate, so
+# UPDATEs only touch the columns that actually changed.
+_SET_UPDATED_AT_FUNCTION = DDL(
+    """
+    CREATE OR REPLACE FUNCTION trigger_set_timestamp() RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.updated_at = now();
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+)
+_SET_UPDATED_AT_TRIGGER = DDL(
+    "CREATE TRIGGER set_updated_at BEFORE UPDATE ON %(table)s "
+    "FOR EACH ROW EXECUTE FUNCTION trigger_set_timestamp()"
+)
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    _SET_UPDATED_AT_FUNCTION.execute_if(dialect="postgresql"),
+)
+_UPDATED_AT_TABLES = tuple(
+    model.__table__ for model in (User, FeedbackToken, Feedback, ToxicityRejectedAttempt)
+)
+for _table in _UPDATED_AT_TABLES:
+    event.listen(
+        _table,
+        "after_create",
+        _SET_UPDATED_AT_TRIGGER.execute_if(dialect="postgresql"),
+    )
+
+
+_CASCADE_FOREIGN_KEYS = tuple(
+    foreign_key
+    for table in Base.metadata.sorted_tables
+    for foreign_key in table.foreign_keys
+    if foreign_key.ondelete == "CASCADE"
+)
+
+
+def _catalog_has(connection, query: str, **params) -> bool:
+    return connection.execute(text(query), params).first() is not None
+
+
+def _upgrade_cascade_foreign_key(connection, foreign_key: ForeignKey) -> None:
+    # create_all leaves Postgres to name constraints, i.e. {table}_{column}_fkey.
+    table = foreign_key.parent.table.name
+    column = foreign_key.parent.name
+    name = f"{table}_{column}_fkey"
+    if _catalog_has(
+        connection,
+        "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:table) "
+        "AND conname = :name AND confdeltype = 'c'",
+        table=table,
+        name=name,
+    ):
+        return
+    target = foreign_key.column
+    connection.execute(
+        text(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}, "
+            f"ADD CONSTRAINT {name} FOREIGN KEY ({column}) "
+            f"REFERENCES {target.table.name} ({target.name}) ON DELETE CASCADE"
+        )
+    )
+
+
+def _upgrade_enum_column(connection, column: Column) -> None:
+    # Columns created before the switch to native_enum=False are Postgres enum types.
+    if not _catalog_has(
+        connection,
+        "SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema() "
+        "AND table_name = :table AND column_name = :column AND data_type = 'USER-DEFINED'",
+        table=column.table.name,
+        column=column.name,
+    ):
+        return
+    connection.execute(
+        text(
+            f"ALTER TABLE {column.table.name} ALTER COLUMN {column.name} "
+            f"TYPE VARCHAR({column.type.length}) USING {column.name}::text"
+        )
+    )
+    connection.execute(text(f"DROP TYPE IF EXISTS {column.type.name}"))
+
+
+def _add_check_constraint(connection, constraint: CheckConstraint) -> None:
+    # NOT VALID skips the full-table scan under ACCESS EXCLUSIVE; rows are
+    # checked afterwards by VALIDATE CONSTRAINT, which doesn't block writes.
+    if _catalog_has(
+        connection,
+        "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:table) AND conname = :name",
+        table=constraint.table.name,
+        name=constraint.name,
+    ):
+        return
+    ddl = AddConstraint(constraint).compile(dialect=connection.dialect)
+    connection.execute(text(f"{ddl} NOT VALID"))
+
+
+def _validate_check_constraints(connection) -> None:
+    for constraint in _CHECK_CONSTRAINTS:
+        if _catalog_has(
+            connection,
+            "SELECT 1 FROM pg_constraint WHERE conrelid = to_regclass(:table) "
+            "AND conname = :name AND NOT convalidated",
+            table=constraint.table.name,
+            name=constraint.name,
+        ):
+            connection.execute(
+                text(f"ALTER TABLE {constraint.table.name} VALIDATE CONSTRAINT {constraint.name}")
+            )
+
+
+def _create_missing_indexes(connection) -> None:
+    for name in _RETIRED_INDEXES:
+        if _catalog_has(connection, "SELECT 1 WHERE to_regclass(:name) IS NOT NULL", name=name):
+            connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            is_valid = connection.execute(
+                text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+                {"name": index.name},
+            ).scalar()
+            if is_valid:
+                continue
+            if is_valid is not None:
+                # A failed CONCURRENTLY build leaves an invalid index behind.
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+            ddl = str(CreateIndex(index).compile(dialect=connection.dialect))
+            connection.execute(text(ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)))
+
+
+_ENUM_COLUMNS = tuple(
+    column
+    for table in Base.metadata.sorted_tables
+    for column in table.columns
+    if isinstance(column.type, Enum) and not column.type.native_enum
+)
+_CHECK_CONSTRAINTS = tuple(
+    constraint
+    for table in Base.metadata.sorted_tables
+    for constraint in table.constraints
+    if isinstance(constraint, CheckConstraint)
+)
+# Indexes since removed from the models as redundant.
+_RETIRED_INDEXES = (
+    "ix_feedback_tokens_course_code",
+    "ix_student_session_submissions_anon_student_key",
+)
+
+# Arbitrary key for pg_advisory_xact_lock, so concurrent upgrades run one at a time.
+_UPGRADE_LOCK_KEY = 0x66656564
+
+
+def upgrade_schema(bind) -> None:
+    """Apply columns, triggers, constraints and indexes that create_all cannot add to existing tables.
+
+    This is a migration step (``python init_db.py``), not something to run on
+    every boot. Each change is checked against the catalog first, so an
+    up-to-date database gets no DDL and no table locks.
+    """
+    if bind.dialect.name != "postgresql":
+        return
+    with bind.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _UPGRADE_LOCK_KEY})
+        # Fail fast instead of queueing an ACCESS EXCLUSIVE lock behind live traffic.
+        connection.execute(text("SET LOCAL lock_timeout = '5s'"))
+        if not _catalog_has(
+            connection, "SELECT 1 FROM pg_proc WHERE proname = 'trigger_set_timestamp'"
+        ):
+            connection.execute(_SET_UPDATED_AT_FUNCTION)
+        for table in _UPDATED_AT_TABLES:
+            if not _catalog_has(
+                connection,
+                "SELECT 1 FROM information_schema.columns WHERE table_schema = current_schema() "
+                "AND table_name = :table AND column_name = 'updated_at'",
+                table=table.name,
+            ):
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {table.name} ADD COLUMN "
+                        "updated_at TIMESTAMPTZ NOT NULL DEFAULT now()"
+                    )
+                )
+            if not _catalog_has(
+                connection,
+                "SELECT 1 FROM pg_trigger WHERE tgrelid = to_regclass(:table) "
+                "AND tgname = 'set_updated_at'",
+                table=table.name,
+            ):
+                connection.execute(_SET_UPDATED_AT_TRIGGER.against(table))
+        for foreign_key in _CASCADE_FOREIGN_KEYS:
+            _upgrade_cascade_foreign_key(connection, foreign_key)
+        for column in _ENUM_COLUMNS:
+            _upgrade_enum_column(connection, column)
+        for constraint in _CHECK_CONSTRAINTS:
+            _add_check_constraint(connection, constraint)
+
+    # CONCURRENTLY cannot run inside a transaction block.
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        _validate_check_constraints(connection)
+        _create_missing_indexes(connection)
+
+# Resolve relationships at import time so the first request doesn't pay for it.
+configure_mappers()
@@ -0,0 +1,16 @@
+from database import SessionLocal
+from utils import refresh_lecturer_course_stats
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        refresh_lecturer_course_stats(db)
+        db.commit()
+        print("Lecturer course stats refreshed.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import sys
 
 from passlib.context import CryptContext
+from sqlalchemy.orm import load_only
 
 from database import SessionLocal
 from models import User
@@ -18,7 +19,12 @@ def main() -> None:
 
     db = SessionLocal()
     try:
-        user = db.query(User).filter(User.email == email).first()
+        user = (
+            db.query(User)
+            .options(load_only(User.id))
+            .filter(User.email == email)
+            .first()
+        )
         if not user:
             print(f"No user found for {email}")
             sys.exit(1)
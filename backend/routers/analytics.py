@@ -1,13 +1,11 @@
-import csv
-import io
-import json
-from datetime import datetime, timezone
+from datetime import datetime, time, timezone
+from functools import lru_cache
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, case, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session, load_only
 
 from database import get_db
 from models import (
@@ -17,8 +15,8 @@ from models import (
     FeedbackFlagReview,
     FeedbackToken,
     ToxicityRejectedAttempt,
-    CourseAssignment,
     FlagReviewAction,
+    LecturerCourseStats,
 )
 from schemas import (
     AdminDashboardResponse,
@@ -36,8 +34,11 @@ from schemas import (
 )
 from dependencies import get_current_user, require_role
 from utils import (
+    assigned_course_codes,
+    cache_admin_dashboard,
+    invalidate_admin_dashboard,
+    iter_csv,
     log_admin_action,
-    pending_alerts_count,
     resolve_semester,
     semester_label,
     semester_range_label,
@@ -52,29 +53,57 @@ from utils import (
 
 router = APIRouter(prefix="/dashboard", tags=["Analytics"])
 
+# Rating aggregates are served from the daily buckets in lecturer_course_stats
+# (rebuilt by refresh_stats.py); averages are weighted by each bucket's count.
+_STATS_TOTAL = func.sum(LecturerCourseStats.feedback_count)
+_STATS_AVG_RATING = func.sum(
+    LecturerCourseStats.avg_rating * LecturerCourseStats.feedback_count
+) / func.nullif(_STATS_TOTAL, 0)
 
-@router.get("/admin", response_model=AdminDashboardResponse)
-def admin_dashboard(
-    _user: User = Depends(require_role(UserRole.ADMIN)),
-    db: Session = Depends(get_db),
-) -> AdminDashboardResponse:
-    total_feedbacks = db.query(func.count(Feedback.id)).scalar() or 0
-    avg_rating = db.query(func.avg(Feedback.rating)).scalar()
-    total_tokens = db.query(func.count(FeedbackToken.id)).scalar() or 0
-    used_tokens = (
-        db.query(func.count(FeedbackToken.id))
-        .filter(FeedbackToken.is_used.is_(True))
-        .scalar()
-        or 0
+# Tells clients how old the bucketed aggregates above are.
+STATS_REFRESHED_HEADER = "X-Stats-Refreshed-At"
+
+
+def _stats_refreshed_at(db: Session) -> str:
+    """ISO time of the last stats refresh, or "" if it has never run."""
+    refreshed_at = db.query(func.max(LecturerCourseStats.refreshed_at)).scalar()
+    return refreshed_at.isoformat() if refreshed_at else ""
+
+
+@cache_admin_dashboard
+def _compute_admin_dashboard(db: Session) -> AdminDashboardResponse:
+    feedback_stats = (
+        db.query(
+            func.count(Feedback.id).label("total"),
+            func.avg(Feedback.rating).label("avg_rating"),
+            func.sum(case((Feedback.is_flagged.is_(True), 1), else_=0)).label("flagged"),
+            func.sum(
+                case(
+                    (Feedback.is_flagged.is_(True) & FeedbackFlagReview.id.is_(None), 1),
+                    else_=0,
+                )
+            ).label("pending_flagged"),
+        )
+        .outerjoin(FeedbackFlagReview, FeedbackFlagReview.feedback_id == Feedback.id)
+        .one()
     )
-    participation_rate = ((used_tokens / total_tokens) * 100.0) if total_tokens else 0.0
-    pending_alerts = pending_alerts_count(db)
-    flagged_count = (
-        db.query(func.count(Feedback.id))
-        .filter(Feedback.is_flagged.is_(True))
-        .scalar()
-        or 0
+    pending_rejected = (
+        select(func.count(ToxicityRejectedAttempt.id))
+        .where(ToxicityRejectedAttempt.is_reviewed.is_(False))
+        .scalar_subquery()
     )
+    token_stats = db.query(
+        func.count(FeedbackToken.id).label("total"),
+        func.sum(case((FeedbackToken.is_used.is_(True), 1), else_=0)).label("used"),
+        pending_rejected.label("pending_rejected"),
+    ).one()
+    total_feedbacks = int(feedback_stats.total or 0)
+    avg_rating = feedback_stats.avg_rating
+    flagged_count = int(feedback_stats.flagged or 0)
+    total_tokens = int(token_stats.total or 0)
+    used_tokens = int(token_stats.used or 0)
+    participation_rate = ((used_tokens / total_tokens) * 100.0) if total_tokens else 0.0
+    pending_alerts = int(feedback_stats.pending_flagged or 0) + int(token_stats.pending_rejected or 0)
     toxicity_hit_rate = (flagged_count / total_feedbacks) if total_feedbacks else 0.0
     global_average = float(avg_rating) if avg_rating is not None else None
 
@@ -111,6 +140,15 @@ def admin_dashboard(
     )
 
 
+@router.get("/admin", response_model=AdminDashboardResponse)
+@router.get("/admin/kpis", response_model=AdminDashboardResponse)
+def admin_dashboard(
+    _user: User = Depends(require_role(UserRole.ADMIN)),
+    db: Session = Depends(get_db),
+) -> AdminDashboardResponse:
+    return _compute_admin_dashboard(db)
+
+
 @router.get("/admin/lecturers", response_model=List[LecturerOption])
 def list_lecturers(
     _user: User = Depends(require_role(UserRole.ADMIN)),
@@ -118,6 +156,7 @@ def list_lecturers(
 ) -> List[LecturerOption]:
     lecturers = (
         db.query(User)
+        .options(load_only(User.id, User.email))
         .filter(User.role == UserRole.LECTURER)
         .order_by(User.email.asc())
         .all()
@@ -125,33 +164,35 @@ def list_lecturers(
     return [LecturerOption(id=lecturer.id, email=lecturer.email) for lecturer in lecturers]
 
 
-@router.get("/admin/kpis", response_model=AdminDashboardResponse)
-def admin_kpis(
-    user: User = Depends(require_role(UserRole.ADMIN)),
-    db: Session = Depends(get_db),
-) -> AdminDashboardResponse:
-    return admin_dashboard(_user=user, db=db)
-
-
 @router.get("/admin/ratings", response_model=List[LecturerRatingResponse])
 def admin_ratings(
+    response: Response,
     search: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     _user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> List[LecturerRatingResponse]:
     query = (
         db.query(
             User.email,
-            func.coalesce(func.avg(Feedback.rating), 0).label("avg_rating"),
-            func.count(Feedback.id).label("total_feedbacks"),
+            func.coalesce(_STATS_AVG_RATING, 0).label("avg_rating"),
+            func.coalesce(_STATS_TOTAL, 0).label("total_feedbacks"),
         )
-        .outerjoin(Feedback, Feedback.lecturer_id == User.id)
+        .outerjoin(LecturerCourseStats, LecturerCourseStats.lecturer_id == User.id)
         .filter(User.role == UserRole.LECTURER)
     )
     if search:
         query = query.filter(User.email.ilike(f"%{search.strip()}%"))
 
-    rows = query.group_by(User.id, User.email).order_by(User.email.asc()).all()
+    rows = (
+        query.group_by(User.id, User.email)
+        .order_by(User.email.asc())
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    response.headers[STATS_REFRESHED_HEADER] = _stats_refreshed_at(db)
 
     return [
         LecturerRatingResponse(
@@ -165,18 +206,27 @@ def admin_ratings(
 
 @router.get("/admin/leaderboard", response_model=List[LeaderboardEntry])
 def admin_leaderboard(
+    response: Response,
     search: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     _user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> List[LeaderboardEntry]:
+    ranking = (
+        func.coalesce(_STATS_AVG_RATING, 0).desc(),
+        func.coalesce(_STATS_TOTAL, 0).desc(),
+        User.email.asc(),
+    )
     query = (
         db.query(
+            func.row_number().over(order_by=ranking).label("rank"),
             User.id.label("lecturer_id"),
             User.email.label("lecturer"),
-            func.coalesce(func.avg(Feedback.rating), 0).label("avg_rating"),
-            func.count(Feedback.id).label("total_feedbacks"),
+            func.coalesce(_STATS_AVG_RATING, 0).label("avg_rating"),
+            func.coalesce(_STATS_TOTAL, 0).label("total_feedbacks"),
         )
-        .outerjoin(Feedback, Feedback.lecturer_id == User.id)
+        .outerjoin(LecturerCourseStats, LecturerCourseStats.lecturer_id == User.id)
         .filter(User.role == UserRole.LECTURER)
     )
     if search:
@@ -184,23 +234,22 @@ def admin_leaderboard(
 
     rows = (
         query.group_by(User.id, User.email)
-        .order_by(
-            func.coalesce(func.avg(Feedback.rating), 0).desc(),
-            func.count(Feedback.id).desc(),
-            User.email.asc(),
-        )
+        .order_by(*ranking)
+        .limit(limit)
+        .offset(offset)
         .all()
     )
+    response.headers[STATS_REFRESHED_HEADER] = _stats_refreshed_at(db)
 
     return [
         LeaderboardEntry(
-            rank=index,
+            rank=row.rank,
             lecturer_id=row.lecturer_id,
             lecturer=row.lecturer,
             avg_rating=float(row.avg_rating or 0),
             total_feedbacks=int(row.total_feedbacks or 0),
         )
-        for index, row in enumerate(rows, start=1)
+        for row in rows
     ]
 
 
@@ -209,7 +258,7 @@ def admin_toxicity_log(
     _user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> List[ToxicityLogEntry]:
-    flagged_count = pending_alerts_count(db)
+    flagged_count = _compute_admin_dashboard(db).pending_alerts
     if not flagged_count:
         return []
     return [ToxicityLogEntry(keyword="flagged", count=flagged_count, last_seen=None)]
@@ -217,53 +266,62 @@ def admin_toxicity_log(
 
 @router.get("/admin/toxicity-feed", response_model=List[ToxicityFeedEntry])
 def toxicity_feed(
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     _user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> List[ToxicityFeedEntry]:
-    feedback_rows = (
-        db.query(Feedback, User.email)
+    flagged_feedback = (
+        select(
+            literal("feedback").label("item_type"),
+            Feedback.id.label("item_id"),
+            Feedback.lecturer_id.label("lecturer_id"),
+            User.email.label("lecturer_email"),
+            Feedback.course_code.label("course_code"),
+            Feedback.text.label("comment"),
+            Feedback.created_at.label("created_at"),
+        )
+        .select_from(Feedback)
         .join(User, User.id == Feedback.lecturer_id)
         .outerjoin(FeedbackFlagReview, FeedbackFlagReview.feedback_id == Feedback.id)
-        .filter(Feedback.is_flagged.is_(True), FeedbackFlagReview.id.is_(None))
-        .order_by(Feedback.created_at.desc())
-        .all()
+        .where(Feedback.is_flagged.is_(True), FeedbackFlagReview.id.is_(None))
     )
-    feedback_items = [
-        ToxicityFeedEntry(
-            item_type="feedback",
-            item_id=feedback.id,
-            lecturer_id=feedback.lecturer_id,
-            lecturer_email=email,
-            course_code=feedback.course_code,
-            comment=(feedback.text or "").strip(),
-            created_at=feedback.created_at.isoformat(),
+    rejected_attempts = (
+        select(
+            literal("rejected_attempt").label("item_type"),
+            ToxicityRejectedAttempt.id.label("item_id"),
+            ToxicityRejectedAttempt.lecturer_id.label("lecturer_id"),
+            User.email.label("lecturer_email"),
+            ToxicityRejectedAttempt.course_code.label("course_code"),
+            ToxicityRejectedAttempt.text.label("comment"),
+            ToxicityRejectedAttempt.created_at.label("created_at"),
         )
-        for feedback, email in feedback_rows
-    ]
-    rejected_rows = (
-        db.query(ToxicityRejectedAttempt, User.email)
+        .select_from(ToxicityRejectedAttempt)
         .join(User, User.id == ToxicityRejectedAttempt.lecturer_id)
-        .filter(ToxicityRejectedAttempt.is_reviewed.is_(False))
-        .order_by(ToxicityRejectedAttempt.created_at.desc())
-        .all()
+        .where(ToxicityRejectedAttempt.is_reviewed.is_(False))
     )
-    rejected_items = [
+    feed = union_all(flagged_feedback, rejected_attempts).subquery()
+    # created_at ties are common, so break them on a total key; otherwise
+    # offset paging can repeat or skip rows.
+    rows = db.execute(
+        select(feed)
+        .order_by(feed.c.created_at.desc(), feed.c.item_type, feed.c.item_id.desc())
+        .limit(limit)
+        .offset(offset)
+    ).all()
+    return [
         ToxicityFeedEntry(
-            item_type="rejected_attempt",
-            item_id=attempt.id,
-            lecturer_id=attempt.lecturer_id,
-            lecturer_email=email,
-            course_code=attempt.course_code,
-            comment=(attempt.text or "").strip(),
-            created_at=attempt.created_at.isoformat(),
+            item_type=row.item_type,
+            item_id=row.item_id,
+            lecturer_id=row.lecturer_id,
+            lecturer_email=row.lecturer_email,
+            course_code=row.course_code,
+            comment=(row.comment or "").strip(),
+            created_at=row.created_at.isoformat(),
         )
-        for attempt, email in rejected_rows
+        for row in rows
     ]
 
-    merged = feedback_items + rejected_items
-    merged.sort(key=lambda entry: entry.created_at, reverse=True)
-    return merged
-
 
 @router.post(
     "/admin/toxicity-feed/{feedback_id}/dismiss",
@@ -275,23 +333,32 @@ def dismiss_toxicity_flag(
     user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> ActionResponse:
-    feedback = db.query(Feedback).filter(Feedback.id == feedback_id).first()
-    if not feedback:
+    row = (
+        db.query(Feedback, FeedbackFlagReview.id)
+        .options(
+            load_only(
+                Feedback.id,
+                Feedback.lecturer_id,
+                Feedback.course_code,
+                Feedback.is_flagged,
+            )
+        )
+        .outerjoin(FeedbackFlagReview, FeedbackFlagReview.feedback_id == Feedback.id)
+        .filter(Feedback.id == feedback_id)
+        .first()
+    )
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Feedback item not found",
         )
+    feedback, existing_review_id = row
     if not feedback.is_flagged:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Feedback is not currently flagged",
         )
-    existing = (
-        db.query(FeedbackFlagReview)
-        .filter(FeedbackFlagReview.feedback_id == feedback.id)
-        .first()
-    )
-    if existing:
+    if existing_review_id is not None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Feedback flag has already been reviewed",
@@ -314,6 +381,7 @@ def dismiss_toxicity_flag(
         details={"course_code": feedback.course_code, "lecturer_id": feedback.lecturer_id},
     )
     db.commit()
+    invalidate_admin_dashboard()
     return ActionResponse(message="Flag dismissed")
 
 
@@ -359,6 +427,7 @@ def dismiss_rejected_attempt(
         },
     )
     db.commit()
+    invalidate_admin_dashboard()
     return ActionResponse(message="Rejected attempt dismissed")
 
 
@@ -376,14 +445,14 @@ def export_semester_summary(
         db.query(
             User.id.label("lecturer_id"),
             User.email.label("lecturer"),
-            func.avg(Feedback.rating).label("avg_rating"),
-            func.count(Feedback.id).label("total_feedbacks"),
+            _STATS_AVG_RATING.label("avg_rating"),
+            _STATS_TOTAL.label("total_feedbacks"),
         )
         .outerjoin(
-            Feedback,
-            (Feedback.lecturer_id == User.id)
-            & (Feedback.created_at >= start)
-            & (Feedback.created_at < end),
+            LecturerCourseStats,
+            (LecturerCourseStats.lecturer_id == User.id)
+            & (LecturerCourseStats.window_start >= start.date())
+            & (LecturerCourseStats.window_start < end.date()),
         )
         .filter(User.role == UserRole.LECTURER)
         .group_by(User.id, User.email)
@@ -391,31 +460,7 @@ def export_semester_summary(
         .all()
     )
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "semester",
-            "range",
-            "lecturer_id",
-            "lecturer_email",
-            "average_rating",
-            "feedback_count",
-        ]
-    )
-    for row in rows:
-        writer.writerow(
-            [
-                sem_label,
-                sem_range,
-                row.lecturer_id,
-                row.lecturer,
-                f"{float(row.avg_rating):.2f}" if row.avg_rating is not None else "",
-                int(row.total_feedbacks or 0),
-            ]
-        )
-
-    payload = output.getvalue()
+    refreshed_at = _stats_refreshed_at(db)
     filename = f"semester-summary-{semester_value(sem_type, sem_year).lower()}.csv"
     log_admin_action(
         db,
@@ -426,10 +471,46 @@ def export_semester_summary(
         details={"semester": semester_value(sem_type, sem_year)},
     )
     db.commit()
+
+    header = [
+        "semester",
+        "range",
+        "lecturer_id",
+        "lecturer_email",
+        "average_rating",
+        "feedback_count",
+        "stats_refreshed_at",
+    ]
+    csv_rows = (
+        [
+            sem_label,
+            sem_range,
+            row.lecturer_id,
+            row.lecturer,
+            f"{float(row.avg_rating):.2f}" if row.avg_rating is not None else "",
+            int(row.total_feedbacks or 0),
+            refreshed_at,
+        ]
+        for row in rows
+    )
     return StreamingResponse(
-        iter([payload]),
+        iter_csv(header, csv_rows),
         media_type="text/csv",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            STATS_REFRESHED_HEADER: refreshed_at,
+        },
+    )
+
+
+@lru_cache(maxsize=512)
+def _semester_option(index: int) -> SemesterOption:
+    sem_type, sem_year = semester_from_index(index)
+    sem_start, sem_end = semester_window(sem_type, sem_year)
+    return SemesterOption(
+        value=semester_value(sem_type, sem_year),
+        label=semester_label(sem_type, sem_year),
+        range=semester_range_label(sem_start, sem_end),
     )
 
 
@@ -447,74 +528,68 @@ def lecturer_dashboard(
     if normalized_course:
         scoped_query = scoped_query.filter(Feedback.course_code == normalized_course)
 
-    breakdown_rows = (
-        db.query(
+    # Daily buckets cover every day before the last refresh; that day and
+    # anything newer is aggregated live so today's feedback shows up at once.
+    last_refreshed = (
+        db.query(func.max(LecturerCourseStats.refreshed_at))
+        .filter(LecturerCourseStats.lecturer_id == user.id)
+        .scalar()
+    )
+    if last_refreshed is not None:
+        if last_refreshed.tzinfo is None:
+            last_refreshed = last_refreshed.replace(tzinfo=timezone.utc)
+        live_since = datetime.combine(
+            last_refreshed.astimezone(timezone.utc).date(), time.min, tzinfo=timezone.utc
+        )
+    else:
+        live_since = None
+
+    bucketed = select(
+        LecturerCourseStats.course_code.label("course_code"),
+        (LecturerCourseStats.avg_rating * LecturerCourseStats.feedback_count).label("rating_sum"),
+        LecturerCourseStats.feedback_count.label("feedback_count"),
+    ).where(LecturerCourseStats.lecturer_id == user.id)
+    live = (
+        select(
             Feedback.course_code.label("course_code"),
-            func.avg(Feedback.rating).label("avg_rating"),
-            func.count(Feedback.id).label("count"),
+            cast(func.sum(Feedback.rating), Float).label("rating_sum"),
+            func.count(Feedback.id).label("feedback_count"),
         )
-        .filter(Feedback.lecturer_id == user.id)
+        .where(Feedback.lecturer_id == user.id)
         .group_by(Feedback.course_code)
-        .order_by(Feedback.course_code.asc())
-        .all()
     )
-    course_breakdown = [
-        CourseBreakdown(
-            course_code=row.course_code,
-            avg_rating=float(row.avg_rating) if row.avg_rating is not None else None,
-            count=int(row.count or 0),
+    if live_since is not None:
+        combined = union_all(
+            bucketed.where(LecturerCourseStats.window_start < live_since.date()),
+            live.where(Feedback.created_at >= live_since),
+        ).subquery()
+    else:
+        combined = live.subquery()
+    combined_total = func.sum(combined.c.feedback_count)
+    breakdown_rows = db.execute(
+        select(
+            combined.c.course_code,
+            (func.sum(combined.c.rating_sum) / func.nullif(combined_total, 0)).label("avg_rating"),
+            combined_total.label("feedback_count"),
         )
-        for row in breakdown_rows
-        if row.course_code
-    ]
-    assigned_courses = [
-        row[0]
-        for row in db.query(CourseAssignment.course_code)
-        .filter(CourseAssignment.lecturer_id == user.id)
-        .order_by(CourseAssignment.course_code.asc())
-        .all()
-    ]
-    seen_courses = {item.course_code for item in course_breakdown}
-    for code in assigned_courses:
-        if code not in seen_courses:
-            course_breakdown.append(
-                CourseBreakdown(course_code=code, avg_rating=None, count=0)
+        .group_by(combined.c.course_code)
+        .order_by(combined.c.course_code.asc())
+    ).all()
+    # Assigned courses without feedback yet still get an (empty) breakdown entry.
+    breakdown_by_course = {
+        code: CourseBreakdown(course_code=code, avg_rating=None, count=0)
+        for code in assigned_course_codes(db, user.id)
+    }
+    for row in breakdown_rows:
+        if row.course_code:
+            breakdown_by_course[row.course_code] = CourseBreakdown(
+                course_code=row.course_code,
+                avg_rating=float(row.avg_rating) if row.avg_rating is not None else None,
+                count=int(row.feedback_count or 0),
             )
-            seen_courses.add(code)
-    course_breakdown.sort(key=lambda item: item.course_code)
+    available_courses = sorted(breakdown_by_course)
+    course_breakdown = [breakdown_by_course[code] for code in available_courses]
     
-    # Calculate semester range
-    min_created = (
-        scoped_query.with_entities(func.min(Feedback.created_at)).scalar()
-    )
-    max_created = (
-        scoped_query.with_entities(func.max(Feedback.created_at)).scalar()
-    )
-
-    if min_created and max_created:
-        start_type, start_year = semester_from_date(min_created)
-        end_type, end_year = semester_from_date(max_created)
-    else:
-        start_type, start_year = semester_from_date(now)
-        end_type, end_year = semester_from_date(now)
-
-    start_index = semester_index(start_type, start_year)
-    end_index = semester_index(end_type, end_year)
-    if end_index < start_index:
-        start_index, end_index = end_index, start_index
-
-    available_semesters: List[SemesterOption] = []
-    for index in range(start_index, end_index + 1):
-        sem_type, sem_year = semester_from_index(index)
-        sem_start, sem_end = semester_window(sem_type, sem_year)
-        available_semesters.append(
-            SemesterOption(
-                value=semester_value(sem_type, sem_year),
-                label=semester_label(sem_type, sem_year),
-                range=semester_range_label(sem_start, sem_end),
-            )
-        )
-
     parsed = parse_semester(semester) if semester else None
     if parsed:
         selected_type, selected_year = parsed
@@ -532,53 +607,53 @@ def lecturer_dashboard(
     prev_label = semester_label(prev_type, prev_year)
     prev_range = semester_range_label(prev_start, prev_end)
 
+    # Semester range plus current/previous totals in a single round-trip.
+    in_current = (Feedback.created_at >= selected_start) & (Feedback.created_at < selected_end)
+    in_previous = (Feedback.created_at >= prev_start) & (Feedback.created_at < prev_end)
+    summary = scoped_query.with_entities(
+        func.min(Feedback.created_at).label("min_created"),
+        func.max(Feedback.created_at).label("max_created"),
+        func.sum(case((in_current, 1), else_=0)).label("current_feedbacks"),
+        func.avg(case((in_current, Feedback.rating))).label("current_avg"),
+        func.sum(case((in_previous, 1), else_=0)).label("previous_feedbacks"),
+        func.avg(case((in_previous, Feedback.rating))).label("previous_avg"),
+        *(
+            func.sum(case((in_current & (Feedback.rating == value), 1), else_=0))
+            for value in range(1, 6)
+        ),
+    ).one()
+    min_created = summary.min_created
+    max_created = summary.max_created
+    current_feedbacks = summary.current_feedbacks or 0
+    current_avg = summary.current_avg
+    previous_feedbacks = summary.previous_feedbacks or 0
+    previous_avg = summary.previous_avg
+
+    if min_created and max_created:
+        start_type, start_year = semester_from_date(min_created)
+        end_type, end_year = semester_from_date(max_created)
+    else:
+        start_type, start_year = semester_from_date(now)
+        end_type, end_year = semester_from_date(now)
+
+    start_index = semester_index(start_type, start_year)
+    end_index = semester_index(end_type, end_year)
+    if end_index < start_index:
+        start_index, end_index = end_index, start_index
+
+    available_semesters = [
+        _semester_option(index) for index in range(start_index, end_index + 1)
+    ]
+
     if not any(option.value == selected_value for option in available_semesters):
-        available_semesters.append(
-            SemesterOption(
-                value=selected_value,
-                label=selected_label,
-                range=selected_range,
-            )
-        )
+        available_semesters.append(_semester_option(selected_index))
         available_semesters.sort(
             key=lambda option: semester_index(
                 *parse_semester(option.value)  # type: ignore[arg-type]
             )
         )
 
-    current_feedbacks = (
-        scoped_query.filter(Feedback.created_at >= selected_start)
-        .filter(Feedback.created_at < selected_end)
-        .count()
-    )
-    current_avg = (
-        scoped_query.with_entities(func.avg(Feedback.rating))
-        .filter(Feedback.created_at >= selected_start)
-        .filter(Feedback.created_at < selected_end)
-        .scalar()
-    )
-    previous_feedbacks = (
-        scoped_query.filter(Feedback.created_at >= prev_start)
-        .filter(Feedback.created_at < prev_end)
-        .count()
-    )
-    previous_avg = (
-        scoped_query.with_entities(func.avg(Feedback.rating))
-        .filter(Feedback.created_at >= prev_start)
-        .filter(Feedback.created_at < prev_end)
-        .scalar()
-    )
-    distribution_rows = (
-        scoped_query.with_entities(Feedback.rating, func.count(Feedback.id))
-        .filter(Feedback.created_at >= selected_start)
-        .filter(Feedback.created_at < selected_end)
-        .group_by(Feedback.rating)
-        .all()
-    )
-    distribution_map = {
-        int(rating): int(count) for rating, count in distribution_rows if rating
-    }
-    rating_distribution = [distribution_map.get(value, 0) for value in range(1, 6)]
+    rating_distribution = [int(count or 0) for count in summary[-5:]]
     distribution_total = sum(rating_distribution)
     negative_count = rating_distribution[0] + rating_distribution[1]
     neutral_count = rating_distribution[2]
@@ -587,44 +662,43 @@ def lecturer_dashboard(
     neutral_pct = (neutral_count / distribution_total * 100.0) if distribution_total else 0.0
     negative_pct = (negative_count / distribution_total * 100.0) if distribution_total else 0.0
 
-    current_val = float(current_avg) if current_avg is not None else 0.0
-    prev_val = float(previous_avg) if previous_avg is not None else 0.0
-    insight_delta = current_val - prev_val if previous_avg is not None else None
+    current_val = float(current_avg) if current_avg is not None else None
+    prev_val = float(previous_avg) if previous_avg is not None else None
+    insight_delta = (current_val or 0.0) - prev_val if prev_val is not None else None
 
     # Get recent comments (limit 50 for dashboard)
     recent_comments = (
-        scoped_query.filter(Feedback.text.isnot(None))
+        scoped_query.with_entities(Feedback.text)
+        .filter(Feedback.text.isnot(None))
+        .filter(Feedback.is_flagged.is_(False))  # Ensure we don't show flagged content
         .filter(Feedback.created_at >= selected_start)
         .filter(Feedback.created_at < selected_end)
         .order_by(Feedback.created_at.desc())
         .limit(50)
         .all()
     )
-    cleaned_comments = [
-        comment.text.strip() for comment in recent_comments if comment.text 
-        and not comment.is_flagged # Ensure we don't show flagged content
-    ]
+    cleaned_comments = [text.strip() for (text,) in recent_comments if text]
 
     return LecturerDashboardResponse(
         total_feedbacks=int(current_feedbacks),
-        avg_rating=float(current_avg) if current_avg is not None else None,
+        avg_rating=current_val,
         cleaned_comments=cleaned_comments,
         current_semester=selected_label,
         current_semester_range=selected_range,
         previous_semester=prev_label,
         previous_semester_range=prev_range,
-        current_avg_rating=float(current_avg) if current_avg is not None else None,
-        previous_avg_rating=float(previous_avg) if previous_avg is not None else None,
+        current_avg_rating=current_val,
+        previous_avg_rating=prev_val,
         current_feedbacks=int(current_feedbacks),
         previous_feedbacks=int(previous_feedbacks),
-        total_avg_rating=float(current_avg) if current_avg is not None else None,
+        total_avg_rating=current_val,
         rating_distribution=rating_distribution,
         positive_pct=positive_pct,
         neutral_pct=neutral_pct,
         negative_pct=negative_pct,
         insight_delta=insight_delta,
         course_breakdown=course_breakdown,
-        available_courses=sorted(list(seen_courses)),
+        available_courses=available_courses,
         available_semesters=available_semesters,
         selected_semester=selected_value,
         selected_course=normalized_course,
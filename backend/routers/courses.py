@@ -1,13 +1,10 @@
-import csv
-import io
-import json
-import secrets
-from datetime import datetime, timezone
+import base64
+import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy import case, func
+from sqlalchemy import Integer, String, cast, func, insert
 from sqlalchemy.orm import Session
 
 from database import get_db
@@ -29,37 +26,139 @@ from schemas import (
 )
 from dependencies import get_current_user, require_role
 from utils import (
+    invalidate_admin_dashboard,
+    invalidate_assigned_course_codes,
+    etag_for,
+    etag_matches,
+    iter_csv,
+    iso_timestamp,
     log_admin_action,
     normalize_course_code,
     normalize_session_key,
     default_session_label,
     resolve_semester,
+    utc_date,
 )
 
 router = APIRouter(prefix="/dashboard/admin", tags=["Courses & Tokens"])
 
+# Tokens issued before session metadata existed fall back to their UTC creation
+# date, labelled the same way as utils.default_session_label.
+_SESSION_KEY = func.coalesce(
+    TokenSession.session_key, cast(utc_date(FeedbackToken.created_at), String)
+)
+_SESSION_LABEL = func.coalesce(
+    TokenSession.session_label, FeedbackToken.course_code + " Lecture " + _SESSION_KEY
+)
+_TOKEN_BYTES = 16
+_USED_TOKENS = func.sum(cast(FeedbackToken.is_used, Integer))
+_TOTAL_TOKENS = func.count(FeedbackToken.id)
+
+
+def _random_tokens(count: int) -> List[str]:
+    """Same format as secrets.token_urlsafe(16), from a single urandom read."""
+    raw = os.urandom(_TOKEN_BYTES * count)
+    return [
+        base64.urlsafe_b64encode(raw[i : i + _TOKEN_BYTES]).rstrip(b"=").decode("ascii")
+        for i in range(0, len(raw), _TOKEN_BYTES)
+    ]
 
-def _generate_unique_token(db: Session) -> str:
+
+def _generate_unique_tokens(db: Session, quantity: int) -> List[str]:
+    tokens = set(_random_tokens(quantity))
     while True:
-        token = secrets.token_urlsafe(16)
-        exists = db.query(FeedbackToken).filter(FeedbackToken.token == token).first()
-        if not exists:
-            return token
+        taken = {
+            row[0]
+            for row in db.query(FeedbackToken.token)
+            .filter(FeedbackToken.token.in_(tokens))
+            .all()
+        }
+        tokens -= taken
+        if len(tokens) == quantity:
+            return list(tokens)
+        tokens.update(_random_tokens(quantity - len(tokens)))
+
+
+def _lecturer_assignment(db: Session, lecturer_id: int, course_code: str):
+    """Fetch the lecturer and any existing assignment to the course in one query."""
+    return (
+        db.query(
+            User.email,
+            User.role,
+            CourseAssignment.id.label("assignment_id"),
+        )
+        .outerjoin(
+            CourseAssignment,
+            (CourseAssignment.lecturer_id == User.id)
+            & (CourseAssignment.course_code == course_code),
+        )
+        .filter(User.id == lecturer_id)
+        .first()
+    )
+
+
+def _token_list_query(
+    db: Session,
+    course_code: Optional[str],
+    lecturer_id: Optional[int],
+    semester: Optional[str],
+):
+    """Token rows for the list and CSV export, with timestamps formatted in SQL."""
+    query = (
+        db.query(
+            FeedbackToken.token,
+            FeedbackToken.course_code,
+            FeedbackToken.lecturer_id,
+            User.email.label("lecturer_email"),
+            _SESSION_KEY.label("session_key"),
+            _SESSION_LABEL.label("session_label"),
+            FeedbackToken.is_used,
+            iso_timestamp(FeedbackToken.created_at).label("created_at"),
+            iso_timestamp(FeedbackToken.used_at).label("used_at"),
+        )
+        .join(User, User.id == FeedbackToken.lecturer_id)
+        .outerjoin(TokenSession, TokenSession.token_id == FeedbackToken.id)
+    )
+    if course_code:
+        query = query.filter(FeedbackToken.course_code == normalize_course_code(course_code))
+    if lecturer_id:
+        query = query.filter(FeedbackToken.lecturer_id == lecturer_id)
+    if semester:
+        _, _, start, end = resolve_semester(semester)
+        query = query.filter(FeedbackToken.created_at >= start, FeedbackToken.created_at < end)
+    return query
 
 
 @router.get("/course-assignments", response_model=List[CourseAssignmentResponse])
 def list_course_assignments(
+    request: Request,
+    response: Response,
     _user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> List[CourseAssignmentResponse]:
+    # Ids only grow, so count + max(id) changes on any insert or delete.
+    etag = etag_for(
+        *db.query(
+            func.count(CourseAssignment.id),
+            func.max(CourseAssignment.id),
+            func.max(User.updated_at),
+        )
+        .join(User, User.id == CourseAssignment.lecturer_id)
+        .one()
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     rows = (
         db.query(CourseAssignment, User.email)
         .join(User, User.id == CourseAssignment.lecturer_id)
         .order_by(CourseAssignment.course_code.asc(), User.email.asc())
         .all()
     )
+    # Rows come straight from the database, so skip per-item validation.
     return [
-        CourseAssignmentResponse(
+        CourseAssignmentResponse.model_construct(
             id=assignment.id,
             lecturer_id=assignment.lecturer_id,
             lecturer_email=email,
@@ -76,23 +175,14 @@ def create_course_assignment(
     user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> CourseAssignmentResponse:
-    lecturer = db.query(User).filter(User.id == payload.lecturer_id).first()
+    course_code = payload.course_code
+    lecturer = _lecturer_assignment(db, payload.lecturer_id, course_code)
     if not lecturer or lecturer.role != UserRole.LECTURER:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid lecturer selected",
         )
-
-    course_code = normalize_course_code(payload.course_code)
-    existing = (
-        db.query(CourseAssignment)
-        .filter(
-            CourseAssignment.lecturer_id == payload.lecturer_id,
-            CourseAssignment.course_code == course_code,
-        )
-        .first()
-    )
-    if existing:
+    if lecturer.assignment_id is not None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Course is already assigned to this lecturer",
@@ -112,6 +202,7 @@ def create_course_assignment(
         details={"lecturer_id": payload.lecturer_id, "course_code": course_code},
     )
     db.commit()
+    invalidate_assigned_course_codes(payload.lecturer_id)
     db.refresh(assignment)
     return CourseAssignmentResponse(
         id=assignment.id,
@@ -145,8 +236,10 @@ def delete_course_assignment(
             "course_code": assignment.course_code,
         },
     )
+    lecturer_id = assignment.lecturer_id
     db.delete(assignment)
     db.commit()
+    invalidate_assigned_course_codes(lecturer_id)
     return ActionResponse(message="Course assignment removed")
 
 
@@ -156,56 +249,47 @@ def generate_tokens(
     user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> TokenGenerateResponse:
-    lecturer = db.query(User).filter(User.id == payload.lecturer_id).first()
+    course_code = payload.course_code
+    lecturer = _lecturer_assignment(db, payload.lecturer_id, course_code)
     if not lecturer or lecturer.role != UserRole.LECTURER:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid lecturer selected",
         )
-
-    course_code = normalize_course_code(payload.course_code)
-    assignment = (
-        db.query(CourseAssignment)
-        .filter(
-            CourseAssignment.lecturer_id == payload.lecturer_id,
-            CourseAssignment.course_code == course_code,
-        )
-        .first()
-    )
-    if not assignment:
+    if lecturer.assignment_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Assign this course to the lecturer before generating tokens",
         )
 
     session_key = normalize_session_key(payload.session_key)
-    session_label = (
-        payload.session_label.strip()
-        if payload.session_label and payload.session_label.strip()
-        else default_session_label(course_code, session_key)
-    )
-
-    tokens: List[str] = []
+    session_label = payload.session_label or default_session_label(course_code, session_key)
 
-    for _ in range(payload.quantity):
-        token_value = _generate_unique_token(db)
-        token_record = FeedbackToken(
-            token=token_value,
-            lecturer_id=payload.lecturer_id,
-            course_code=course_code,
-            is_used=False,
-        )
-        db.add(token_record)
-        db.flush()
-        db.add(
-            TokenSession(
-                token_id=token_record.id,
-                course_code=course_code,
-                session_key=session_key,
-                session_label=session_label,
-            )
-        )
-        tokens.append(token_value)
+    tokens = _generate_unique_tokens(db, payload.quantity)
+    token_ids = db.execute(
+        insert(FeedbackToken).returning(FeedbackToken.id),
+        [
+            {
+                "token": token_value,
+                "lecturer_id": payload.lecturer_id,
+                "course_code": course_code,
+                "is_used": False,
+            }
+            for token_value in tokens
+        ],
+    ).scalars().all()
+    db.execute(
+        insert(TokenSession),
+        [
+            {
+                "token_id": token_id,
+                "course_code": course_code,
+                "session_key": session_key,
+                "session_label": session_label,
+            }
+            for token_id in token_ids
+        ],
+    )
 
     log_admin_action(
         db,
@@ -222,6 +306,7 @@ def generate_tokens(
         },
     )
     db.commit()
+    invalidate_admin_dashboard()
 
     return TokenGenerateResponse(
         course_code=course_code,
@@ -237,65 +322,58 @@ def list_tokens(
     course_code: Optional[str] = None,
     lecturer_id: Optional[int] = None,
     semester: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     _user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> List[TokenListResponse]:
-    query = (
-        db.query(FeedbackToken, User.email, TokenSession.session_key, TokenSession.session_label)
-        .join(User, User.id == FeedbackToken.lecturer_id)
-        .outerjoin(TokenSession, TokenSession.token_id == FeedbackToken.id)
+    query = _token_list_query(db, course_code, lecturer_id, semester)
+    rows = (
+        query.order_by(FeedbackToken.created_at.desc(), FeedbackToken.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .all()
     )
-    if course_code:
-        query = query.filter(FeedbackToken.course_code == normalize_course_code(course_code))
-    if lecturer_id:
-        query = query.filter(FeedbackToken.lecturer_id == lecturer_id)
-    if semester:
-        _, _, start, end = resolve_semester(semester)
-        query = query.filter(FeedbackToken.created_at >= start, FeedbackToken.created_at < end)
-
-    rows = query.order_by(FeedbackToken.created_at.desc()).all()
     return [
-        TokenListResponse(
-            token=token.token,
-            course_code=token.course_code,
-            lecturer_id=token.lecturer_id,
-            lecturer_email=email,
-            session_key=(
-                session_key
-                or (
-                    token.created_at.astimezone(timezone.utc).date().isoformat()
-                    if token.created_at
-                    else datetime.now(timezone.utc).date().isoformat()
-                )
-            ),
-            session_label=(
-                session_label
-                or default_session_label(
-                    token.course_code,
-                    token.created_at.astimezone(timezone.utc).date().isoformat()
-                    if token.created_at
-                    else datetime.now(timezone.utc).date().isoformat(),
-                )
-            ),
-            is_used=token.is_used,
-            created_at=token.created_at.isoformat(),
-            used_at=token.used_at.isoformat() if token.used_at else None,
+        TokenListResponse.model_construct(
+            token=row.token,
+            course_code=row.course_code,
+            lecturer_id=row.lecturer_id,
+            lecturer_email=row.lecturer_email,
+            session_key=row.session_key,
+            session_label=row.session_label,
+            is_used=row.is_used,
+            created_at=row.created_at,
+            used_at=row.used_at,
         )
-        for token, email, session_key, session_label in rows
+        for row in rows
     ]
 
 
 @router.get("/tokens/tracker", response_model=List[TokenTrackerResponse])
 def token_tracker(
+    request: Request,
+    response: Response,
     _user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> List[TokenTrackerResponse]:
-    used_expr = case((FeedbackToken.is_used.is_(True), 1), else_=0)
+    etag = etag_for(
+        *db.query(
+            _TOTAL_TOKENS,
+            func.max(FeedbackToken.id),
+            func.max(FeedbackToken.used_at),
+        ).one()
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     rows = (
         db.query(
             FeedbackToken.course_code,
-            func.sum(used_expr).label("used_tokens"),
-            func.count(FeedbackToken.id).label("total_tokens"),
+            _USED_TOKENS.label("used_tokens"),
+            _TOTAL_TOKENS.label("total_tokens"),
+            (_USED_TOKENS * 100.0 / func.nullif(_TOTAL_TOKENS, 0)).label("usage_pct"),
         )
         .group_by(FeedbackToken.course_code)
         .order_by(FeedbackToken.course_code.asc())
@@ -306,7 +384,7 @@ def token_tracker(
             course_code=row.course_code,
             used_tokens=int(row.used_tokens or 0),
             total_tokens=int(row.total_tokens or 0),
-            usage_pct=((int(row.used_tokens or 0) / int(row.total_tokens or 1)) * 100.0),
+            usage_pct=float(row.usage_pct or 0.0),
         )
         for row in rows
     ]
@@ -320,63 +398,8 @@ def export_token_list(
     user: User = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db),
 ) -> StreamingResponse:
-    query = (
-        db.query(FeedbackToken, User.email, TokenSession.session_key, TokenSession.session_label)
-        .join(User, User.id == FeedbackToken.lecturer_id)
-        .outerjoin(TokenSession, TokenSession.token_id == FeedbackToken.id)
-    )
-    if course_code:
-        query = query.filter(FeedbackToken.course_code == normalize_course_code(course_code))
-    if lecturer_id:
-        query = query.filter(FeedbackToken.lecturer_id == lecturer_id)
-    if semester:
-        _, _, start, end = resolve_semester(semester)
-        query = query.filter(FeedbackToken.created_at >= start, FeedbackToken.created_at < end)
+    query = _token_list_query(db, course_code, lecturer_id, semester)
 
-    rows = query.order_by(FeedbackToken.created_at.desc()).all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "token",
-            "course_code",
-            "lecturer_id",
-            "lecturer_email",
-            "session_key",
-            "session_label",
-            "is_used",
-            "created_at",
-            "used_at",
-        ]
-    )
-    for token, email, session_key, session_label in rows:
-        resolved_session_key = (
-            session_key
-            or (
-                token.created_at.astimezone(timezone.utc).date().isoformat()
-                if token.created_at
-                else datetime.now(timezone.utc).date().isoformat()
-            )
-        )
-        resolved_session_label = (
-            session_label or default_session_label(token.course_code, resolved_session_key)
-        )
-        writer.writerow(
-            [
-                token.token,
-                token.course_code,
-                token.lecturer_id,
-                email,
-                resolved_session_key,
-                resolved_session_label,
-                "yes" if token.is_used else "no",
-                token.created_at.isoformat(),
-                token.used_at.isoformat() if token.used_at else "",
-            ]
-        )
-
-    payload = output.getvalue()
     log_admin_action(
         db,
         admin_id=user.id,
@@ -390,8 +413,41 @@ def export_token_list(
         },
     )
     db.commit()
+
+    header = [
+        "token",
+        "course_code",
+        "lecturer_id",
+        "lecturer_email",
+        "session_key",
+        "session_label",
+        "is_used",
+        "created_at",
+        "used_at",
+    ]
+
+    def csv_rows():
+        # Rows are pulled from a server-side cursor while the response streams.
+        rows = (
+            query.order_by(FeedbackToken.created_at.desc())
+            .execution_options(stream_results=True)
+            .yield_per(1000)
+        )
+        for row in rows:
+            yield [
+                row.token,
+                row.course_code,
+                row.lecturer_id,
+                row.lecturer_email,
+                row.session_key,
+                row.session_label,
+                "yes" if row.is_used else "no",
+                row.created_at,
+                row.used_at or "",
+            ]
+
     return StreamingResponse(
-        iter([payload]),
+        iter_csv(header, csv_rows()),
         media_type="text/csv",
         headers={"Content-Disposition": 'attachment; filename="token-list.csv"'},
     )
@@ -1,7 +1,8 @@
 import hmac
 import hashlib
 from datetime import datetime, timezone
-from typing import Tuple
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
@@ -25,33 +26,57 @@ from schemas import (
     TokenStatusResponse,
 )
 from dependencies import require_role, ANON_KEY_SECRET
-from utils import toxicity_reason, default_session_label
+from utils import default_session_label, invalidate_admin_dashboard, toxicity_reason
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
+_ANON_SECRET_BYTES = ANON_KEY_SECRET.encode("utf-8")
+_DUPLICATE_SUBMISSION_DETAIL = "You already submitted feedback for this lecture session."
 
+
+@lru_cache(maxsize=8192)
 def _anon_student_key(student_id: int, course_code: str, session_key: str) -> str:
     payload = f"{student_id}:{course_code}:{session_key}".encode("utf-8")
     return hmac.new(
-        ANON_KEY_SECRET.encode("utf-8"),
+        _ANON_SECRET_BYTES,
         payload,
         hashlib.sha256,
     ).hexdigest()
 
 
-def _resolve_token_session(db: Session, token_record: FeedbackToken) -> Tuple[str, str]:
-    metadata = (
-        db.query(TokenSession).filter(TokenSession.token_id == token_record.id).first()
+def _load_token(
+    db: Session, token_value: str
+) -> Optional[Tuple[FeedbackToken, str, str, Optional[str]]]:
+    """Fetch a token with its session metadata and lecturer email in one query."""
+    row = (
+        db.query(FeedbackToken, TokenSession.session_key, TokenSession.session_label, User.email)
+        .outerjoin(TokenSession, TokenSession.token_id == FeedbackToken.id)
+        .outerjoin(User, User.id == FeedbackToken.lecturer_id)
+        .filter(FeedbackToken.token == token_value)
+        .first()
     )
-    if metadata:
-        return metadata.session_key, metadata.session_label
+    if not row:
+        return None
 
-    fallback_key = (
-        token_record.created_at.astimezone(timezone.utc).date().isoformat()
-        if token_record.created_at
-        else datetime.now(timezone.utc).date().isoformat()
-    )
-    return fallback_key, default_session_label(token_record.course_code, fallback_key)
+    token_record, session_key, session_label, lecturer_email = row
+    if not session_key:
+        session_key = (
+            token_record.created_at.astimezone(timezone.utc).date().isoformat()
+            if token_record.created_at
+            else datetime.now(timezone.utc).date().isoformat()
+        )
+        session_label = default_session_label(token_record.course_code, session_key)
+    return token_record, session_key, session_label, lecturer_email
+
+
+def _is_duplicate_submission(exc: IntegrityError) -> bool:
+    """Tell a one-submission-per-session violation apart from other integrity errors."""
+    diag = getattr(exc.orig, "diag", None)
+    constraint_name = getattr(diag, "constraint_name", None)
+    if constraint_name:
+        return constraint_name == "uq_student_session_submission_once"
+    # Drivers without diagnostics (e.g. SQLite) only report the table and columns.
+    return f"{StudentSessionSubmission.__tablename__}.anon_student_key" in str(exc.orig)
 
 
 @router.post("/moderate", response_model=FeedbackModerationResponse)
@@ -75,12 +100,8 @@ def feedback_token_status(
     student: User = Depends(require_role(UserRole.STUDENT)),
     db: Session = Depends(get_db),
 ) -> TokenStatusResponse:
-    token_record = (
-        db.query(FeedbackToken)
-        .filter(FeedbackToken.token == token.strip())
-        .first()
-    )
-    if not token_record:
+    loaded = _load_token(db, token.strip())
+    if not loaded:
         return TokenStatusResponse(
             token=token.strip(),
             valid=False,
@@ -89,19 +110,17 @@ def feedback_token_status(
             reason="Invalid feedback token",
         )
 
-    session_key, session_label = _resolve_token_session(db, token_record)
+    token_record, session_key, session_label, lecturer_email = loaded
     anon_key = _anon_student_key(student.id, token_record.course_code, session_key)
-    already_submitted = (
+    already_submitted = db.query(
         db.query(StudentSessionSubmission.id)
         .filter(
             StudentSessionSubmission.anon_student_key == anon_key,
             StudentSessionSubmission.course_code == token_record.course_code,
             StudentSessionSubmission.session_key == session_key,
         )
-        .first()
-        is not None
-    )
-    lecturer = db.query(User).filter(User.id == token_record.lecturer_id).first()
+        .exists()
+    ).scalar()
 
     if token_record.is_used:
         return TokenStatusResponse(
@@ -110,7 +129,7 @@ def feedback_token_status(
             is_used=True,
             can_submit=False,
             course_code=token_record.course_code,
-            lecturer_email=lecturer.email if lecturer else None,
+            lecturer_email=lecturer_email,
             session_key=session_key,
             session_label=session_label,
             reason="This token has already been used",
@@ -123,7 +142,7 @@ def feedback_token_status(
             is_used=False,
             can_submit=False,
             course_code=token_record.course_code,
-            lecturer_email=lecturer.email if lecturer else None,
+            lecturer_email=lecturer_email,
             session_key=session_key,
             session_label=session_label,
             reason="You already submitted feedback for this lecture session",
@@ -135,7 +154,7 @@ def feedback_token_status(
         is_used=False,
         can_submit=True,
         course_code=token_record.course_code,
-        lecturer_email=lecturer.email if lecturer else None,
+        lecturer_email=lecturer_email,
         session_key=session_key,
         session_label=session_label,
     )
@@ -147,32 +166,30 @@ def submit_feedback(
     student: User = Depends(require_role(UserRole.STUDENT)),
     db: Session = Depends(get_db),
 ) -> FeedbackSubmitResponse:
-    token_record = (
-        db.query(FeedbackToken)
-        .filter(FeedbackToken.token == payload.token)
-        .first()
-    )
-    if not token_record or token_record.is_used:
+    loaded = _load_token(db, payload.token)
+    if not loaded or loaded[0].is_used:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or already used feedback token",
         )
 
-    session_key, _session_label = _resolve_token_session(db, token_record)
+    token_record, session_key, _session_label, _lecturer_email = loaded
     anon_key = _anon_student_key(student.id, token_record.course_code, session_key)
-    existing_submission = (
-        db.query(StudentSessionSubmission)
+    # Turn repeat submissions away before moderation, so a toxic retry doesn't
+    # land in the review queue; the unique constraint still catches races.
+    already_submitted = db.query(
+        db.query(StudentSessionSubmission.id)
         .filter(
             StudentSessionSubmission.anon_student_key == anon_key,
             StudentSessionSubmission.course_code == token_record.course_code,
             StudentSessionSubmission.session_key == session_key,
         )
-        .first()
-    )
-    if existing_submission:
+        .exists()
+    ).scalar()
+    if already_submitted:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You already submitted feedback for this lecture session.",
+            status_code=status.HTTP_409_CONFLICT,
+            detail=_DUPLICATE_SUBMISSION_DETAIL,
         )
 
     reason = toxicity_reason(payload.text)
@@ -187,6 +204,7 @@ def submit_feedback(
         )
         db.add(rejected_attempt)
         db.commit()
+        invalidate_admin_dashboard()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=(
@@ -214,21 +232,29 @@ def submit_feedback(
     )
 
     db.add(feedback)
-    db.add(submission_lock)
     try:
+        # Flush the feedback first so the submission lock carries its id and
+        # everything lands in one transaction.
+        db.flush()
+        feedback_id = feedback.id
+        submission_lock.feedback_id = feedback_id
+        db.add(submission_lock)
         db.commit()
     except IntegrityError as exc:
         db.rollback()
+        if _is_duplicate_submission(exc):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=_DUPLICATE_SUBMISSION_DETAIL,
+            ) from exc
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="You already submitted feedback for this lecture session.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or already used feedback token",
         ) from exc
-    db.refresh(feedback)
-    submission_lock.feedback_id = feedback.id
-    db.commit()
+    invalidate_admin_dashboard()
 
     return FeedbackSubmitResponse(
-        id=feedback.id,
+        id=feedback_id,
         message="Feedback submitted",
         is_flagged=False,
     )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from models import UserRole
+from utils import normalize_course_code
 
 class RegisterRequest(BaseModel):
     email: str = Field(min_length=3, max_length=255)
@@ -74,6 +75,11 @@ class CourseAssignmentCreateRequest(BaseModel):
     lecturer_id: int
     course_code: str = Field(min_length=2, max_length=50)
 
+    @field_validator("course_code")
+    @classmethod
+    def _normalize_course_code(cls, value: str) -> str:
+        return normalize_course_code(value)
+
 
 class CourseAssignmentResponse(BaseModel):
     id: int
@@ -94,6 +100,16 @@ class TokenGenerateRequest(BaseModel):
     session_key: Optional[str] = Field(default=None, max_length=32)
     session_label: Optional[str] = Field(default=None, max_length=120)
 
+    @field_validator("course_code")
+    @classmethod
+    def _normalize_course_code(cls, value: str) -> str:
+        return normalize_course_code(value)
+
+    @field_validator("session_label")
+    @classmethod
+    def _strip_session_label(cls, value: Optional[str]) -> Optional[str]:
+        return (value.strip() or None) if value else None
+
 
 class TokenGenerateResponse(BaseModel):
     course_code: str
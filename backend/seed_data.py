@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import argparse
+import base64
+import enum
+import io
+import os
 import random
-import secrets
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
+from sqlalchemy import insert, select, text
 from sqlalchemy.orm import Session
 
 from database import Base, SessionLocal, engine
@@ -21,13 +27,16 @@ from models import (
     ToxicityRejectedAttempt,
     User,
     UserRole,
+    upgrade_schema,
 )
+from utils import refresh_lecturer_course_stats
 
 
 pwd_context = CryptContext(schemes=["bcrypt", "pbkdf2_sha256"], deprecated="auto")
 
 DEMO_ADMIN_EMAIL = "admin.demo@feedback.com"
 DEMO_ADMIN_PASSWORD = "admin1234"
+DEMO_TOKEN_BYTES = 10
 
 DEMO_LECTURERS = [
     ("ada.obi@feedback.com", ["CSC401", "CSC405"]),
@@ -66,7 +75,87 @@ def _random_date(start: datetime, end: datetime) -> datetime:
     return start + timedelta(days=random.randint(0, delta.days - 1))
 
 
-def _ensure_user(db: Session, email: str, role: UserRole, password: str) -> User:
+def _random_dates(start: datetime, end: datetime, count: int) -> list[datetime]:
+    """Draw `count` dates the same way as _random_date, in one call."""
+    days = (end - start).days
+    if days <= 1:
+        return [start] * count
+    return [start + timedelta(days=offset) for offset in random.choices(range(days), k=count)]
+
+
+def _copy_value(value: object) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _insert_rows(db: Session, model: type, rows: list[dict]) -> None:
+    """Insert plain row dicts, streaming them through COPY on PostgreSQL."""
+    if not rows:
+        return
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(insert(model), rows)
+        return
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT text)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+@lru_cache(maxsize=None)
+def _hash_password(password: str, fast: bool) -> str:
+    # Demo users share passwords, so each one is hashed at most once per run.
+    if fast:
+        return pbkdf2_sha256.using(rounds=1).hash(password)
+    return pwd_context.hash(password)
+
+
+def _insert_rows_returning_ids(db: Session, model: type, rows: list[dict]) -> list[int]:
+    """Insert row dicts and return their ids in the same order."""
+    if db.get_bind().dialect.name != "postgresql":
+        return db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+    # Reserve the ids up front so the rows can go through COPY, which
+    # cannot hand generated keys back.
+    ids = db.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+        {"table": model.__tablename__, "count": len(rows)},
+    ).scalars().all()
+    for row_id, row in zip(ids, rows):
+        row["id"] = row_id
+    _insert_rows(db, model, rows)
+    return ids
+
+
+def _ensure_user(
+    db: Session, email: str, role: UserRole, password: str, fast: bool = False
+) -> User:
     normalized = email.strip().lower()
     user = db.query(User).filter(User.email == normalized).first()
     if user:
@@ -77,7 +166,7 @@ def _ensure_user(db: Session, email: str, role: UserRole, password: str) -> User
 
     user = User(
         email=normalized,
-        hashed_password=pwd_context.hash(password),
+        hashed_password=_hash_password(password, fast),
         role=role,
     )
     db.add(user)
@@ -89,31 +178,18 @@ def _clear_demo_data(db: Session, lecturer_ids: list[int]) -> None:
     if not lecturer_ids:
         return
 
-    feedback_ids = [
-        item[0]
-        for item in db.query(Feedback.id)
-        .filter(Feedback.lecturer_id.in_(lecturer_ids))
-        .all()
-    ]
-    if feedback_ids:
-        db.query(FeedbackFlagReview).filter(
-            FeedbackFlagReview.feedback_id.in_(feedback_ids)
-        ).delete(synchronize_session=False)
-
-    token_ids = [
-        item[0]
-        for item in db.query(FeedbackToken.id)
-        .filter(FeedbackToken.lecturer_id.in_(lecturer_ids))
-        .all()
-    ]
+    feedback_ids = select(Feedback.id).where(Feedback.lecturer_id.in_(lecturer_ids))
+    token_ids = select(FeedbackToken.id).where(FeedbackToken.lecturer_id.in_(lecturer_ids))
 
-    if token_ids:
-        db.query(StudentSessionSubmission).filter(
-            StudentSessionSubmission.token_id.in_(token_ids)
-        ).delete(synchronize_session=False)
-        db.query(TokenSession).filter(TokenSession.token_id.in_(token_ids)).delete(
-            synchronize_session=False
-        )
+    db.query(FeedbackFlagReview).filter(
+        FeedbackFlagReview.feedback_id.in_(feedback_ids)
+    ).delete(synchronize_session=False)
+    db.query(StudentSessionSubmission).filter(
+        StudentSessionSubmission.token_id.in_(token_ids)
+    ).delete(synchronize_session=False)
+    db.query(TokenSession).filter(TokenSession.token_id.in_(token_ids)).delete(
+        synchronize_session=False
+    )
     db.query(Feedback).filter(Feedback.lecturer_id.in_(lecturer_ids)).delete(
         synchronize_session=False
     )
@@ -143,41 +219,30 @@ def _seed_for_assignment(
     pending_flagged = 0
     dismissed_flags = 0
 
-    tokens: list[FeedbackToken] = []
-    for _ in range(total_tokens):
-        token = FeedbackToken(
-            token=f"demo-{course_code.lower()}-{secrets.token_urlsafe(10)}",
-            lecturer_id=lecturer_id,
-            course_code=course_code,
-            is_used=False,
-            created_at=_random_date(previous_start, current_end),
-        )
-        db.add(token)
-        tokens.append(token)
-    db.flush()
-    for token in tokens:
-        session_key = (
-            token.created_at.astimezone(timezone.utc).date().isoformat()
-            if token.created_at
-            else datetime.now(timezone.utc).date().isoformat()
-        )
-        db.add(
-            TokenSession(
-                token_id=token.id,
-                course_code=course_code,
-                session_key=session_key,
-                session_label=_default_session_label(course_code, session_key),
-            )
-        )
+    entropy = os.urandom(DEMO_TOKEN_BYTES * total_tokens)
+    token_dates = _random_dates(previous_start, current_end, total_tokens)
+    current_dates = _random_dates(current_start, current_end, used_tokens)
+    previous_dates = _random_dates(previous_start, previous_end, used_tokens)
+    token_rows = [
+        {
+            "token": f"demo-{course_code.lower()}-"
+            + base64.urlsafe_b64encode(entropy[offset : offset + DEMO_TOKEN_BYTES])
+            .rstrip(b"=")
+            .decode("ascii"),
+            "lecturer_id": lecturer_id,
+            "course_code": course_code,
+            "is_used": False,
+            "used_at": None,
+            "created_at": created_at,
+        }
+        for offset, created_at in zip(range(0, len(entropy), DEMO_TOKEN_BYTES), token_dates)
+    ]
 
-    selected_tokens = random.sample(tokens, used_tokens)
-    for index, token in enumerate(selected_tokens):
+    feedback_rows: list[dict] = []
+    dismissed_positions: list[int] = []
+    for index, token_index in enumerate(random.sample(range(total_tokens), used_tokens)):
         in_current = index % 3 != 0
-        created_at = (
-            _random_date(current_start, current_end)
-            if in_current
-            else _random_date(previous_start, previous_end)
-        )
+        created_at = current_dates[index] if in_current else previous_dates[index]
 
         sentiment_roll = random.random()
         if sentiment_roll < 0.58:
@@ -197,43 +262,75 @@ def _seed_for_assignment(
             text = random.choice(TOXIC_COMMENTS)
             is_flagged = True
 
-        feedback = Feedback(
-            lecturer_id=lecturer_id,
-            token_id=token.id,
-            course_code=course_code,
-            rating=rating,
-            text=text,
-            sentiment_score=float(rating) / 5.0,
-            is_flagged=is_flagged,
-            created_at=created_at,
-        )
-        db.add(feedback)
-        db.flush()
-
-        token.is_used = True
-        token.used_at = created_at
-
         if is_flagged and index % 22 == 0:
-            feedback.is_flagged = False
-            review = FeedbackFlagReview(
-                feedback_id=feedback.id,
-                reviewed_by=lecturer_id,
-                action=FlagReviewAction.DISMISSED,
-                note="Demo dismissed for false positive",
-                reviewed_at=created_at + timedelta(minutes=20),
-            )
-            db.add(review)
+            is_flagged = False
+            dismissed_positions.append(len(feedback_rows))
             dismissed_flags += 1
         elif is_flagged:
             pending_flagged += 1
 
+        token_rows[token_index]["is_used"] = True
+        token_rows[token_index]["used_at"] = created_at
+        feedback_rows.append(
+            {
+                "lecturer_id": lecturer_id,
+                "token_index": token_index,
+                "course_code": course_code,
+                "rating": rating,
+                "text": text,
+                "sentiment_score": float(rating) / 5.0,
+                "is_flagged": is_flagged,
+                "created_at": created_at,
+            }
+        )
+
+    token_ids = _insert_rows_returning_ids(db, FeedbackToken, token_rows)
+
+    session_rows = []
+    for token_id, token_row in zip(token_ids, token_rows):
+        session_key = token_row["created_at"].astimezone(timezone.utc).date().isoformat()
+        session_rows.append(
+            {
+                "token_id": token_id,
+                "course_code": course_code,
+                "session_key": session_key,
+                "session_label": _default_session_label(course_code, session_key),
+            }
+        )
+    _insert_rows(db, TokenSession, session_rows)
+
+    if feedback_rows:
+        for feedback_row in feedback_rows:
+            feedback_row["token_id"] = token_ids[feedback_row.pop("token_index")]
+        feedback_ids = _insert_rows_returning_ids(db, Feedback, feedback_rows)
+
+        _insert_rows(
+            db,
+            FeedbackFlagReview,
+            [
+                {
+                    "feedback_id": feedback_ids[position],
+                    "reviewed_by": lecturer_id,
+                    "action": FlagReviewAction.DISMISSED,
+                    "note": "Demo dismissed for false positive",
+                    "reviewed_at": feedback_rows[position]["created_at"] + timedelta(minutes=20),
+                }
+                for position in dismissed_positions
+            ],
+        )
+
     return total_tokens, used_tokens, pending_flagged, dismissed_flags
 
 
-def seed(clear_existing: bool) -> None:
+def seed(clear_existing: bool, fast: bool = False) -> None:
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
     db = SessionLocal()
     try:
+        if engine.dialect.name == "postgresql":
+            # Demo data is disposable; don't wait on the WAL flush at commit.
+            db.execute(text("SET LOCAL synchronous_commit = OFF"))
+
         previous_start = datetime(2025, 4, 1, tzinfo=timezone.utc)
         previous_end = datetime(2025, 10, 1, tzinfo=timezone.utc)
         current_start = datetime(2025, 10, 1, tzinfo=timezone.utc)
@@ -244,6 +341,7 @@ def seed(clear_existing: bool) -> None:
             email=DEMO_ADMIN_EMAIL,
             role=UserRole.ADMIN,
             password=DEMO_ADMIN_PASSWORD,
+            fast=fast,
         )
 
         lecturer_users: list[User] = []
@@ -254,6 +352,7 @@ def seed(clear_existing: bool) -> None:
                     email=lecturer_email,
                     role=UserRole.LECTURER,
                     password="lecturer1234",
+                    fast=fast,
                 )
             )
         db.flush()
@@ -300,6 +399,8 @@ def seed(clear_existing: bool) -> None:
                 total_pending += assignment_pending
                 total_dismissed += assignment_dismissed
 
+        db.flush()
+        refresh_lecturer_course_stats(db)
         db.commit()
         participation = (total_used / total_tokens * 100.0) if total_tokens else 0.0
 
@@ -324,8 +425,13 @@ def main() -> None:
         action="store_true",
         help="Do not clear prior demo records for demo lecturers before seeding.",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Hash demo passwords with single-round PBKDF2 instead of bcrypt (local use only).",
+    )
     args = parser.parse_args()
-    seed(clear_existing=not args.no_clear)
+    seed(clear_existing=not args.no_clear, fast=args.fast)
 
 
 if __name__ == "__main__":
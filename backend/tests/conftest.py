@@ -1,7 +1,7 @@
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -10,6 +10,9 @@ os.environ["DATABASE_URL"] = "sqlite://"
 
 from database import Base, get_db
 from main import app
+from routers.analytics import _semester_option
+from routers.feedback import _anon_student_key
+from utils import _ASSIGNED_COURSES_CACHE, _toxicity_reason_cached, invalidate_admin_dashboard
 
 # Create in-memory SQLite database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite://"
@@ -21,23 +24,58 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-@pytest.fixture(scope="module")
-def client():
-    # Create tables
+
+# pysqlite defers BEGIN on its own, which breaks SAVEPOINT handling; let
+# SQLAlchemy emit it instead so each test can roll back cleanly.
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, _record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    # Create tables once per run; tests are isolated by rollback below.
     Base.metadata.create_all(bind=engine)
-    
-    # Override get_db dependency
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def db_session(database):
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Handler commits only release a SAVEPOINT; the outer transaction is
+    # rolled back when the test ends.
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+
     def override_get_db():
-        try:
-            db = TestingSessionLocal()
-            yield db
-        finally:
-            db.close()
-            
+        yield session
+
     app.dependency_overrides[get_db] = override_get_db
-    
+    yield session
+
+    app.dependency_overrides.pop(get_db, None)
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    # Module-level caches outlive the per-test rollback; start every test cold.
+    invalidate_admin_dashboard()
+    _ASSIGNED_COURSES_CACHE.clear()
+    for cached_function in (_toxicity_reason_cached, _anon_student_key, _semester_option):
+        cached_function.cache_clear()
+    yield
+
+
+@pytest.fixture(scope="session")
+def client(database):
     with TestClient(app) as c:
         yield c
-        
-    # Drop tables
-    Base.metadata.drop_all(bind=engine)
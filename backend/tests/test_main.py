@@ -1,4 +1,324 @@
+import pytest
+
+
 def test_health_check(client):
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"status": "ok", "message": "Feedback System API is running"}
+
+
+def test_user_email_is_normalized():
+    from models import User
+
+    user = User(email="  Ada.Obi@Feedback.com ", hashed_password="x")
+    assert user.email == "ada.obi@feedback.com"
+
+
+PROFANITY_CORPUS = [
+    "Great lecture, very clear examples.",
+    "bails",
+    "hare",
+    "dang",
+    "whare",
+    "The class was fun",
+    "balls",
+    "ba11s",
+    "h0re",
+    "fvck this course",
+    "what the sh1t",
+    "$hit happens",
+    "you b1tch",
+    "son of a bitch",
+    "@ss",
+    "a$$",
+]
+
+
+def test_contains_profanity_matches_better_profanity():
+    from better_profanity import profanity
+    from utils import _contains_profanity, _load_profanity_words
+
+    _load_profanity_words()
+    for text in PROFANITY_CORPUS:
+        assert _contains_profanity(text) == profanity.contains_profanity(text), text
+
+
+def test_plain_words_are_not_profanity():
+    from utils import toxicity_reason
+
+    for text in ("bails", "hare", "dang"):
+        assert toxicity_reason(text) is None
+
+
+def test_second_submission_for_same_session_is_rejected(client, db_session):
+    from dependencies import create_access_token
+    from models import FeedbackToken, TokenSession, User, UserRole
+
+    lecturer = User(email="lecturer@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    student = User(email="student@feedback.com", hashed_password="x", role=UserRole.STUDENT)
+    db_session.add_all([lecturer, student])
+    db_session.flush()
+    for value in ("session-token-1", "session-token-2"):
+        token = FeedbackToken(token=value, lecturer_id=lecturer.id, course_code="CSC101")
+        db_session.add(token)
+        db_session.flush()
+        db_session.add(
+            TokenSession(
+                token_id=token.id,
+                course_code="CSC101",
+                session_key="2026-10-16",
+                session_label="CSC101 Lecture 2026-10-16",
+            )
+        )
+    db_session.flush()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(student.id)})}"}
+    first = client.post(
+        "/feedback/submit", json={"token": "session-token-1", "rating": 5}, headers=headers
+    )
+    assert first.status_code == 200
+
+    second = client.post(
+        "/feedback/submit", json={"token": "session-token-2", "rating": 4}, headers=headers
+    )
+    assert second.status_code == 409
+    assert second.json()["detail"] == "You already submitted feedback for this lecture session."
+
+
+def test_toxicity_feed_pages_across_timestamp_ties(client, db_session):
+    from datetime import datetime, timezone
+
+    from dependencies import create_access_token
+    from models import Feedback, FeedbackToken, ToxicityRejectedAttempt, User, UserRole
+
+    admin = User(email="admin@feedback.com", hashed_password="x", role=UserRole.ADMIN)
+    lecturer = User(email="lecturer@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    db_session.add_all([admin, lecturer])
+    db_session.flush()
+    token = FeedbackToken(token="feed-token", lecturer_id=lecturer.id, course_code="CSC101")
+    db_session.add(token)
+    db_session.flush()
+
+    tied_at = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+    for _ in range(3):
+        db_session.add(
+            Feedback(
+                lecturer_id=lecturer.id,
+                course_code="CSC101",
+                rating=1,
+                text="flagged",
+                is_flagged=True,
+                created_at=tied_at,
+            )
+        )
+        db_session.add(
+            ToxicityRejectedAttempt(
+                token_id=token.id,
+                lecturer_id=lecturer.id,
+                course_code="CSC101",
+                text="rejected",
+                created_at=tied_at,
+            )
+        )
+    db_session.flush()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+    full = client.get("/dashboard/admin/toxicity-feed", headers=headers).json()
+    paged = []
+    for offset in range(0, 6, 2):
+        response = client.get(
+            "/dashboard/admin/toxicity-feed",
+            params={"limit": 2, "offset": offset},
+            headers=headers,
+        )
+        paged.extend(response.json())
+
+    keys = [(item["item_type"], item["item_id"]) for item in paged]
+    assert len(set(keys)) == 6
+    assert keys == [(item["item_type"], item["item_id"]) for item in full]
+
+
+def test_toxic_retry_after_submission_is_not_queued_for_review(client, db_session):
+    from dependencies import create_access_token
+    from models import FeedbackToken, TokenSession, ToxicityRejectedAttempt, User, UserRole
+
+    lecturer = User(email="lecturer@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    student = User(email="student@feedback.com", hashed_password="x", role=UserRole.STUDENT)
+    db_session.add_all([lecturer, student])
+    db_session.flush()
+    for value in ("retry-token-1", "retry-token-2"):
+        token = FeedbackToken(token=value, lecturer_id=lecturer.id, course_code="CSC101")
+        db_session.add(token)
+        db_session.flush()
+        db_session.add(
+            TokenSession(
+                token_id=token.id,
+                course_code="CSC101",
+                session_key="2026-10-16",
+                session_label="CSC101 Lecture 2026-10-16",
+            )
+        )
+    db_session.flush()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(student.id)})}"}
+    first = client.post(
+        "/feedback/submit", json={"token": "retry-token-1", "rating": 5}, headers=headers
+    )
+    assert first.status_code == 200
+
+    retry = client.post(
+        "/feedback/submit",
+        json={"token": "retry-token-2", "rating": 1, "text": "you idiot"},
+        headers=headers,
+    )
+    assert retry.status_code == 409
+    assert db_session.query(ToxicityRejectedAttempt).count() == 0
+
+
+def test_only_the_once_per_session_constraint_counts_as_duplicate(db_session):
+    from sqlalchemy.exc import IntegrityError
+
+    from models import FeedbackToken, StudentSessionSubmission, User, UserRole
+    from routers.feedback import _is_duplicate_submission
+
+    lecturer = User(email="lecturer@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    db_session.add(lecturer)
+    db_session.flush()
+    token = FeedbackToken(token="lock-token", lecturer_id=lecturer.id, course_code="CSC101")
+    db_session.add(token)
+    db_session.flush()
+
+    def submission(**overrides):
+        values = dict(
+            anon_student_key="anon",
+            course_code="CSC101",
+            session_key="2026-10-16",
+            token_id=token.id,
+        )
+        values.update(overrides)
+        return StudentSessionSubmission(**values)
+
+    db_session.add(submission())
+    db_session.flush()
+
+    for row, expected in ((submission(), True), (submission(session_key=None), False)):
+        with pytest.raises(IntegrityError) as excinfo:
+            with db_session.begin_nested():
+                db_session.add(row)
+        assert _is_duplicate_submission(excinfo.value) is expected
+
+
+def test_admin_kpis_include_feedback_submitted_after_caching(client, db_session):
+    from dependencies import create_access_token
+    from models import FeedbackToken, User, UserRole
+
+    admin = User(email="admin@feedback.com", hashed_password="x", role=UserRole.ADMIN)
+    lecturer = User(email="lecturer@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    student = User(email="student@feedback.com", hashed_password="x", role=UserRole.STUDENT)
+    db_session.add_all([admin, lecturer, student])
+    db_session.flush()
+    db_session.add_all(
+        [
+            FeedbackToken(token="kpi-token-1", lecturer_id=lecturer.id, course_code="CSC101"),
+            FeedbackToken(token="kpi-token-2", lecturer_id=lecturer.id, course_code="CSC102"),
+        ]
+    )
+    db_session.flush()
+
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+    student_headers = {"Authorization": f"Bearer {create_access_token({'sub': str(student.id)})}"}
+    before = client.get("/dashboard/admin/kpis", headers=admin_headers).json()
+
+    submitted = client.post(
+        "/feedback/submit", json={"token": "kpi-token-1", "rating": 4}, headers=student_headers
+    )
+    assert submitted.status_code == 200
+    rejected = client.post(
+        "/feedback/submit",
+        json={"token": "kpi-token-2", "rating": 1, "text": "you idiot"},
+        headers=student_headers,
+    )
+    assert rejected.status_code == 400
+
+    after = client.get("/dashboard/admin/kpis", headers=admin_headers).json()
+    assert after["total_feedbacks"] == before["total_feedbacks"] + 1
+    assert after["pending_alerts"] == before["pending_alerts"] + 1
+
+
+def test_lecturer_breakdown_counts_refresh_day_feedback_once(client, db_session):
+    from datetime import datetime, timedelta, timezone
+
+    from dependencies import create_access_token
+    from models import Feedback, User, UserRole
+    from utils import refresh_lecturer_course_stats
+
+    lecturer = User(email="lecturer@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    db_session.add(lecturer)
+    db_session.flush()
+    now = datetime.now(timezone.utc)
+    for rating, created_at in ((2, now - timedelta(days=2)), (3, now)):
+        db_session.add(
+            Feedback(lecturer_id=lecturer.id, course_code="CSC101", rating=rating, created_at=created_at)
+        )
+    db_session.flush()
+    refresh_lecturer_course_stats(db_session)
+    # Submitted after the refresh, so only the live aggregate can see it.
+    db_session.add(
+        Feedback(lecturer_id=lecturer.id, course_code="CSC101", rating=5, created_at=now)
+    )
+    db_session.flush()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(lecturer.id)})}"}
+    response = client.get("/dashboard/lecturer", headers=headers)
+    assert response.status_code == 200
+    (breakdown,) = response.json()["course_breakdown"]
+    assert breakdown["course_code"] == "CSC101"
+    assert breakdown["count"] == 3
+    assert breakdown["avg_rating"] == pytest.approx(10 / 3)
+
+
+def test_leaderboard_ranks_lecturers_by_refreshed_stats(client, db_session):
+    from dependencies import create_access_token
+    from models import Feedback, User, UserRole
+    from utils import refresh_lecturer_course_stats
+
+    admin = User(email="admin@feedback.com", hashed_password="x", role=UserRole.ADMIN)
+    strong = User(email="strong@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    weak = User(email="weak@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    db_session.add_all([admin, strong, weak])
+    db_session.flush()
+    for lecturer, ratings in ((weak, (2, 3)), (strong, (5, 4))):
+        for rating in ratings:
+            db_session.add(Feedback(lecturer_id=lecturer.id, course_code="CSC101", rating=rating))
+    db_session.flush()
+    refresh_lecturer_course_stats(db_session)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+    response = client.get("/dashboard/admin/leaderboard", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Stats-Refreshed-At"]
+    ranks = [(row["rank"], row["lecturer"], row["total_feedbacks"]) for row in response.json()]
+    assert ranks == [(1, "strong@feedback.com", 2), (2, "weak@feedback.com", 2)]
+
+
+def test_admin_lists_answer_matching_etags_with_304(client, db_session):
+    from dependencies import create_access_token
+    from models import CourseAssignment, FeedbackToken, User, UserRole
+
+    admin = User(email="admin@feedback.com", hashed_password="x", role=UserRole.ADMIN)
+    lecturer = User(email="lecturer@feedback.com", hashed_password="x", role=UserRole.LECTURER)
+    db_session.add_all([admin, lecturer])
+    db_session.flush()
+    db_session.add(CourseAssignment(lecturer_id=lecturer.id, course_code="CSC101"))
+    db_session.add(FeedbackToken(token="etag-token", lecturer_id=lecturer.id, course_code="CSC101"))
+    db_session.flush()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id)})}"}
+    for path in ("/dashboard/admin/course-assignments", "/dashboard/admin/tokens/tracker"):
+        first = client.get(path, headers=headers)
+        assert first.status_code == 200
+        etag = first.headers["ETag"]
+
+        cached = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
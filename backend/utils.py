@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import csv
+import hashlib
 import re
-import json
-from typing import Optional, Any
-
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from importlib.resources import files
+from itertools import chain
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
 from better_profanity import profanity
-from fastapi import HTTPException, status
-from sqlalchemy import func
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from fastapi import HTTPException, Request, status
+from sqlalchemy import Date, String, case, delete, func, insert, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.orm import Session
-from models import AdminAuditLog, Feedback, FeedbackFlagReview, ToxicityRejectedAttempt
-
-profanity.load_censor_words()
+from models import (
+    AdminAuditLog,
+    CourseAssignment,
+    Feedback,
+    LecturerCourseStats,
+)
 
 
 def log_admin_action(
@@ -26,26 +40,154 @@ def log_admin_action(
         action=action,
         entity_type=entity_type,
         entity_id=entity_id,
-        details=json.dumps(details) if details else None,
+        details=orjson.dumps(details, option=orjson.OPT_NAIVE_UTC).decode() if details else None,
     )
     db.add(record)
 
 
-def pending_alerts_count(db: Session) -> int:
-    feedback_pending = (
-        db.query(func.count(Feedback.id))
-        .outerjoin(FeedbackFlagReview, FeedbackFlagReview.feedback_id == Feedback.id)
-        .filter(Feedback.is_flagged.is_(True), FeedbackFlagReview.id.is_(None))
-        .scalar()
-        or 0
+class _Echo:
+    """File-like sink whose write() hands back the formatted line."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(header: Sequence[Any], rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    """Yield CSV lines one at a time for a StreamingResponse."""
+    writer = csv.writer(_Echo())
+    for row in chain((header,), rows):
+        yield writer.writerow(row)
+
+
+def etag_for(*parts: Any) -> str:
+    """Weak ETag derived from a cheap aggregate over the rows behind a response."""
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    return bool(header) and etag in {tag.strip() for tag in header.split(",")}
+
+
+class iso_timestamp(FunctionElement):
+    """Format a UTC timestamp column as an ISO-8601 string inside the SELECT."""
+
+    type = String()
+    inherit_cache = True
+    name = "iso_timestamp"
+
+
+@compiles(iso_timestamp)
+def _compile_iso_timestamp(element, compiler, **kw):
+    (column,) = element.clauses.clauses
+    return compiler.process(func.strftime("%Y-%m-%dT%H:%M:%f+00:00", column), **kw)
+
+
+@compiles(iso_timestamp, "postgresql")
+def _compile_iso_timestamp_postgresql(element, compiler, **kw):
+    (column,) = element.clauses.clauses
+    return compiler.process(
+        func.to_char(func.timezone("UTC", column), 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"'),
+        **kw,
     )
-    rejected_pending = (
-        db.query(func.count(ToxicityRejectedAttempt.id))
-        .filter(ToxicityRejectedAttempt.is_reviewed.is_(False))
-        .scalar()
-        or 0
+
+
+class utc_date(FunctionElement):
+    """Calendar date of a timestamp column in UTC, whatever the session time zone."""
+
+    type = Date()
+    inherit_cache = True
+    name = "utc_date"
+
+
+@compiles(utc_date)
+def _compile_utc_date(element, compiler, **kw):
+    (column,) = element.clauses.clauses
+    return compiler.process(func.date(column), **kw)
+
+
+@compiles(utc_date, "postgresql")
+def _compile_utc_date_postgresql(element, compiler, **kw):
+    (column,) = element.clauses.clauses
+    return compiler.process(func.date(func.timezone("UTC", column)), **kw)
+
+
+# Course assignments change rarely; cache them per lecturer so dashboard
+# requests skip the lookup. Mutating endpoints call the invalidator.
+_ASSIGNED_COURSES_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+_ASSIGNED_COURSES_LOCK = threading.Lock()
+
+
+@cached(
+    _ASSIGNED_COURSES_CACHE,
+    key=lambda _db, lecturer_id: hashkey(lecturer_id),
+    lock=_ASSIGNED_COURSES_LOCK,
+)
+def assigned_course_codes(db: Session, lecturer_id: int) -> tuple[str, ...]:
+    rows = (
+        db.query(CourseAssignment.course_code)
+        .filter(CourseAssignment.lecturer_id == lecturer_id)
+        .order_by(CourseAssignment.course_code.asc())
+        .all()
+    )
+    return tuple(row[0] for row in rows)
+
+
+def invalidate_assigned_course_codes(lecturer_id: int) -> None:
+    with _ASSIGNED_COURSES_LOCK:
+        _ASSIGNED_COURSES_CACHE.pop(hashkey(lecturer_id), None)
+
+
+# Dashboards poll the admin KPIs; a few seconds of staleness is fine, so
+# every poller within the TTL shares one computed result.
+_ADMIN_DASHBOARD_CACHE: TTLCache = TTLCache(maxsize=1, ttl=20)
+_ADMIN_DASHBOARD_LOCK = threading.Lock()
+
+cache_admin_dashboard = cached(
+    _ADMIN_DASHBOARD_CACHE,
+    key=lambda _db: hashkey("admin_dashboard"),
+    lock=_ADMIN_DASHBOARD_LOCK,
+)
+
+
+def invalidate_admin_dashboard() -> None:
+    with _ADMIN_DASHBOARD_LOCK:
+        _ADMIN_DASHBOARD_CACHE.clear()
+
+
+def refresh_lecturer_course_stats(db: Session) -> None:
+    """Rebuild the per-lecturer, per-course, per-day feedback aggregates.
+
+    Dashboards read from ``lecturer_course_stats`` instead of scanning the
+    whole ``feedback`` table; run this on a schedule (see ``refresh_stats.py``).
+    """
+    window_start = utc_date(Feedback.created_at)
+    aggregate = (
+        select(
+            Feedback.lecturer_id,
+            Feedback.course_code,
+            window_start,
+            func.count(Feedback.id),
+            func.avg(Feedback.rating),
+            func.sum(case((Feedback.is_flagged.is_(True), 1), else_=0)),
+        )
+        .group_by(Feedback.lecturer_id, Feedback.course_code, window_start)
+    )
+    db.execute(delete(LecturerCourseStats))
+    db.execute(
+        insert(LecturerCourseStats).from_select(
+            [
+                LecturerCourseStats.lecturer_id,
+                LecturerCourseStats.course_code,
+                LecturerCourseStats.window_start,
+                LecturerCourseStats.feedback_count,
+                LecturerCourseStats.avg_rating,
+                LecturerCourseStats.flagged_count,
+            ],
+            aggregate,
+        )
     )
-    return int(feedback_pending) + int(rejected_pending)
 
 _LEETSPEAK_MAP = str.maketrans(
     {
@@ -90,31 +232,138 @@ _DISRESPECTFUL_PATTERNS = (
 )
 
 
+# Terms and patterns compiled once into a single alternation. Normalized text
+# is plain [a-z0-9 ], so ASCII-only \b/\s matching gives the same results
+# without Unicode category lookups.
+_DISRESPECTFUL_RE = re.compile(
+    "|".join(
+        (
+            r"\b(?:" + "|".join(re.escape(term) for term in _DISRESPECTFUL_TERMS) + r")\b",
+            *_DISRESPECTFUL_PATTERNS,
+        )
+    ),
+    re.ASCII,
+)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# Byte table doing lower() + _LEETSPEAK_MAP + _NON_ALNUM_RE in one pass for
+# ASCII input, which is nearly all feedback.
+_ASCII_MODERATION_TABLE = bytes(
+    ord(char) if char.isascii() and char.isalnum() else ord(" ")
+    for char in (chr(code).lower().translate(_LEETSPEAK_MAP) for code in range(256))
+)
+
+
 def _normalize_for_moderation(text: str) -> str:
+    if text.isascii():
+        translated = text.encode("ascii").translate(_ASCII_MODERATION_TABLE)
+        return b" ".join(translated.split()).decode("ascii")
     normalized = text.lower().translate(_LEETSPEAK_MAP)
-    normalized = re.sub(r"[^a-z0-9\s]", " ", normalized)
-    return re.sub(r"\s+", " ", normalized).strip()
+    normalized = _NON_ALNUM_RE.sub(" ", normalized)
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+# Character substitutions better_profanity accepts for each wordlist letter
+# (its CHARS_MAPPING, minus the "*" wildcard, which falls back to the library).
+_PROFANITY_CHAR_VARIANTS = {
+    "a": "a@4",
+    "i": "il1",
+    "o": "o0@",
+    "u": "uv",
+    "v": "vu",
+    "l": "l1",
+    "e": "e3",
+    "s": "s$5",
+    "t": "t7",
+}
+# Collapses every character that can stand in for another into one class, so
+# a lookup key can only over-match; _matches_profane_entry then checks exactly.
+_PROFANITY_KEY_MAP = str.maketrans("@4o01lv3$57", "aaaaiiuesst")
+# better_profanity's word characters: letters, digits and @ $ * ' "
+_PROFANITY_WORD_RE = re.compile(r"(?:[^\W_]|[@$*'\"])+")
+
+
+def _profanity_key(phrase: str) -> str:
+    return phrase.translate(_PROFANITY_KEY_MAP)
+
+
+def _matches_profane_entry(candidate: str, entry: str) -> bool:
+    return len(candidate) == len(entry) and all(
+        char in _PROFANITY_CHAR_VARIANTS.get(expected, expected)
+        for char, expected in zip(candidate, entry)
+    )
 
 
-def toxicity_reason(text: str | None) -> Optional[str]:
-    if not text:
-        return None
+# Wordlist entries grouped by lookup key. Reading the packaged wordlist
+# directly skips better_profanity's load_censor_words(), which builds its own
+# variant objects and is only needed for the "*" fallback.
+_PROFANE_ENTRIES: dict[str, list[str]] = {}
+for _entry in (
+    files("better_profanity").joinpath("profanity_wordlist.txt").read_text(encoding="utf-8").splitlines()
+):
+    _entry = _entry.strip().lower()
+    if _entry:
+        _PROFANE_ENTRIES.setdefault(_profanity_key(_entry), []).append(_entry)
+_MAX_PROFANE_PHRASE_WORDS = max(
+    (len(_PROFANITY_WORD_RE.findall(entry)) for entries in _PROFANE_ENTRIES.values() for entry in entries),
+    default=0,
+)
+_PROFANITY_LOAD_LOCK = threading.Lock()
+
+
+def _load_profanity_words() -> None:
+    with _PROFANITY_LOAD_LOCK:
+        if not profanity.CENSOR_WORDSET:
+            profanity.load_censor_words()
 
-    if profanity.contains_profanity(text):
-        return "PROFANITY"
 
-    normalized = _normalize_for_moderation(text)
-    for term in _DISRESPECTFUL_TERMS:
-        escaped = re.escape(term)
-        if re.search(rf"\b{escaped}\b", normalized):
-            return "DISRESPECTFUL_LANGUAGE"
+def _is_profane_phrase(candidate: str) -> bool:
+    return any(
+        _matches_profane_entry(candidate, entry)
+        for entry in _PROFANE_ENTRIES.get(_profanity_key(candidate), ())
+    )
+
+
+def _contains_profanity(text: str) -> bool:
+    """Same verdict as profanity.contains_profanity, without re-censoring the text."""
+    lowered = text.lower()
+    spans = [match.span() for match in _PROFANITY_WORD_RE.finditer(lowered)]
+    for size in range(1, _MAX_PROFANE_PHRASE_WORDS + 1):
+        for first in range(len(spans) - size + 1):
+            last = first + size - 1
+            # Like better_profanity, try multi-word phrases both with the
+            # original separators and run together.
+            if _is_profane_phrase(lowered[spans[first][0] : spans[last][1]]):
+                return True
+            if size > 1 and _is_profane_phrase(
+                "".join(lowered[begin:end] for begin, end in spans[first : last + 1])
+            ):
+                return True
+    if "*" not in text:
+        return False
+    _load_profanity_words()
+    return profanity.contains_profanity(text)
+
+
+@lru_cache(maxsize=4096)
+def _toxicity_reason_cached(text: str) -> Optional[str]:
+    if _contains_profanity(text):
+        return "PROFANITY"
 
-    for pattern in _DISRESPECTFUL_PATTERNS:
-        if re.search(pattern, normalized):
-            return "DISRESPECTFUL_LANGUAGE"
+    if _DISRESPECTFUL_RE.search(_normalize_for_moderation(text)):
+        return "DISRESPECTFUL_LANGUAGE"
     return None
 
 
+def toxicity_reason(text: str | None) -> Optional[str]:
+    if not text:
+        return None
+    # Both checks are case-insensitive, so case variants share a cache entry.
+    return _toxicity_reason_cached(text.lower())
+
+
 def is_toxic_text(text: str | None) -> bool:
     return toxicity_reason(text) is not None
 
@@ -131,21 +380,29 @@ def enforce_toxicity_guard(text: str | None) -> None:
         )
 
 
+    _load_profanity_words()
     return profanity.censor(text)
 
 
+@lru_cache(maxsize=2048)
 def default_session_label(course_code: str, session_key: str) -> str:
     return f"{course_code} Lecture {session_key}"
 
 
+@lru_cache(maxsize=2048)
 def normalize_course_code(course_code: str) -> str:
     return "".join(course_code.strip().upper().split())
 
 
 def normalize_session_key(session_key: Optional[str]) -> str:
-    from datetime import datetime, timezone
     if not session_key:
+        # "today" must not be memoized, so only explicit keys hit the cache.
         return datetime.now(timezone.utc).date().isoformat()
+    return _parse_session_key(session_key)
+
+
+@lru_cache(maxsize=2048)
+def _parse_session_key(session_key: str) -> str:
     try:
         return datetime.strptime(session_key.strip(), "%Y-%m-%d").date().isoformat()
     except ValueError as exc:
@@ -156,13 +413,11 @@ def normalize_session_key(session_key: Optional[str]) -> str:
 
 
 # Semester Logic
-from datetime import datetime, timezone, timedelta
-from typing import Tuple, List
-
 def semester_index(semester_type: str, year: int) -> int:
     return year * 2 + (1 if semester_type == "HARMATTAN" else 0)
 
 
+@lru_cache(maxsize=512)
 def semester_from_index(index: int) -> Tuple[str, int]:
     year = index // 2
     if index % 2 == 0:
@@ -178,12 +433,14 @@ def semester_from_date(value: datetime) -> Tuple[str, int]:
     return "RAIN", value.year
 
 
+@lru_cache(maxsize=512)
 def semester_label(semester_type: str, year: int) -> str:
     if semester_type == "HARMATTAN":
         return f"Harmattan {year}/{year + 1}"
     return f"Rain {year}"
 
 
+@lru_cache(maxsize=512)
 def semester_window(semester_type: str, year: int) -> Tuple[datetime, datetime]:
     if semester_type == "HARMATTAN":
         return (
@@ -196,15 +453,18 @@ def semester_window(semester_type: str, year: int) -> Tuple[datetime, datetime]:
     )
 
 
+@lru_cache(maxsize=512)
 def semester_range_label(start: datetime, end: datetime) -> str:
     end_inclusive = end - timedelta(days=1)
     return f"{start:%b %d, %Y} - {end_inclusive:%b %d, %Y}"
 
 
+@lru_cache(maxsize=512)
 def semester_value(semester_type: str, year: int) -> str:
     return f"{semester_type}-{year}"
 
 
+@lru_cache(maxsize=512)
 def parse_semester(value: str) -> Optional[Tuple[str, int]]:
     try:
         semester_type, year_text = value.strip().upper().split("-", 1)
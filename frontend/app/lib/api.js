@@ -24,6 +24,25 @@ export const moderateFeedback = (text) =>
 const buildAuthHeaders = (token) =>
   token ? { Authorization: `Bearer ${token}` } : undefined;
 
+// List endpoints cap each response at PAGE_LIMIT rows; follow offsets until a
+// short page so callers still receive the full list in `data`.
+const PAGE_LIMIT = 500;
+
+const fetchAllPages = async (path, token, params = {}) => {
+  const rows = [];
+  let response;
+  for (let offset = 0; ; offset += PAGE_LIMIT) {
+    response = await api.get(path, {
+      headers: buildAuthHeaders(token),
+      params: { ...params, limit: PAGE_LIMIT, offset },
+    });
+    const page = response.data || [];
+    rows.push(...page);
+    if (page.length < PAGE_LIMIT) break;
+  }
+  return { ...response, data: rows };
+};
+
 export const loginUser = (payload) => api.post("/auth/login", payload);
 export const registerUser = (payload) => api.post("/auth/register", payload);
 
@@ -36,8 +55,8 @@ export const fetchLecturerDashboard = (token, params = {}) =>
     params,
   });
 
-export const fetchAdminRatings = (token) =>
-  api.get("/dashboard/admin/ratings", { headers: buildAuthHeaders(token) });
+export const fetchAdminRatings = (token, params = {}) =>
+  fetchAllPages("/dashboard/admin/ratings", token, params);
 
 export const fetchToxicityLog = (token) =>
   api.get("/dashboard/admin/toxicity-log", { headers: buildAuthHeaders(token) });
@@ -71,15 +90,10 @@ export const fetchTokenTracker = (token) =>
   });
 
 export const fetchAdminLeaderboard = (token, params = {}) =>
-  api.get("/dashboard/admin/leaderboard", {
-    headers: buildAuthHeaders(token),
-    params,
-  });
+  fetchAllPages("/dashboard/admin/leaderboard", token, params);
 
 export const fetchToxicityFeed = (token) =>
-  api.get("/dashboard/admin/toxicity-feed", {
-    headers: buildAuthHeaders(token),
-  });
+  fetchAllPages("/dashboard/admin/toxicity-feed", token);
 
 export const dismissToxicityFlag = (token, feedbackId, payload = {}) =>
   api.post(`/dashboard/admin/toxicity-feed/${feedbackId}/dismiss`, payload, {